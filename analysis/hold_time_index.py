@@ -0,0 +1,216 @@
+import math
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import Config
+
+QUANTILES = (0.25, 0.5, 0.75)
+_MIN_MINUTES = 1 / 60 # Sub-second holds are bucketed as one second
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch: each bucket is a fixed fraction of its value wide, so every
+    quantile is within `relative_accuracy` of the exact one. Sparse, mergeable, and capped at
+    max_buckets (the lowest buckets are folded together first, keeping the upper tail sharp).
+    """
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 1024):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {} # Bucket k holds values in (gamma^(k-1), gamma^k]
+        self.count = 0
+
+    def add(self, value: float):
+        key = math.ceil(math.log(max(value, _MIN_MINUTES)) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.count += other.count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        extra = len(keys) - self.max_buckets
+        self.buckets[keys[extra]] += sum(self.buckets.pop(k) for k in keys[:extra])
+
+    def quantiles(self, qs=QUANTILES) -> List[float]:
+        if not self.count:
+            return [float("nan")] * len(qs)
+        keys = sorted(self.buckets)
+        cum = np.cumsum([self.buckets[k] for k in keys])
+        idx = np.searchsorted(cum, [q * (self.count - 1) for q in qs], side="right")
+        return [2 * self.gamma ** keys[i] / (self.gamma + 1) for i in idx]
+
+    def get_state(self) -> Dict:
+        return {"relative_accuracy": self.relative_accuracy, "max_buckets": self.max_buckets,
+                "buckets": [[k, n] for k, n in self.buckets.items()]}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"], state["max_buckets"])
+        sketch.buckets = {int(k): int(n) for k, n in state["buckets"]}
+        sketch.count = sum(sketch.buckets.values())
+        return sketch
+
+
+class TokenHoldTimes:
+    """
+    One token's hold-time sketch plus the smart wallets' still-open entry lots (FIFO, as in
+    HoldingTimeAnalyzer) and the ingest watermark. Quantiles are cached on update.
+    """
+    MAX_WALLETS = 2048 # Least recently active wallets' open lots are dropped beyond this
+    MAX_LOTS_PER_WALLET = 32
+
+    def __init__(self, token_address: str, sketch: Optional[QuantileSketch] = None):
+        self.token_address = token_address
+        self.sketch = sketch or QuantileSketch()
+        self.lots: "OrderedDict[str, deque]" = OrderedDict() # wallet -> entry timestamps
+        self.last_ts = float("-inf")
+        self.last_hashes: set = set() # Hashes already ingested at last_ts
+        self.p25, self.median, self.p75 = self.sketch.quantiles()
+
+    @property
+    def samples(self) -> int:
+        return self.sketch.count
+
+    def _open(self, wallet: str, ts: float):
+        lots = self.lots.get(wallet)
+        if lots is None:
+            lots = self.lots[wallet] = deque(maxlen=self.MAX_LOTS_PER_WALLET)
+            if len(self.lots) > self.MAX_WALLETS:
+                self.lots.popitem(last=False)
+        else:
+            self.lots.move_to_end(wallet)
+        lots.append(ts)
+
+    def _close(self, wallet: str, ts: float) -> bool:
+        lots = self.lots.get(wallet)
+        if not lots:
+            return False
+        entry = lots.popleft()
+        if not lots:
+            del self.lots[wallet]
+        if ts <= entry:
+            return False
+        self.sketch.add((ts - entry) / 60)
+        return True
+
+    def ingest(self, tx_hash: np.ndarray, from_address: np.ndarray, to_address: np.ndarray,
+               timestamps: np.ndarray, from_smart: np.ndarray, to_smart: np.ndarray) -> int:
+        """
+        Feeds transfers not seen before, in time order. A smart wallet receiving the token
+        opens a lot, sending it closes its oldest lot. Returns the number of completed holds.
+        """
+        new = timestamps > self.last_ts
+        at_mark = np.flatnonzero(timestamps == self.last_ts)
+        if len(at_mark) and self.last_hashes:
+            new[at_mark] = [h not in self.last_hashes for h in tx_hash[at_mark]]
+        rows = np.flatnonzero(new)
+        if not len(rows):
+            return 0
+        rows = rows[np.argsort(timestamps[rows], kind="stable")]
+
+        closed = 0
+        for i in rows:
+            ts = float(timestamps[i])
+            if from_smart[i]:
+                closed += self._close(from_address[i], ts)
+            if to_smart[i]:
+                self._open(to_address[i], ts)
+
+        last_ts = float(timestamps[rows[-1]])
+        if last_ts != self.last_ts:
+            self.last_hashes = set()
+        self.last_ts = last_ts
+        self.last_hashes.update(tx_hash[rows][timestamps[rows] == last_ts].tolist())
+        if closed:
+            self.p25, self.median, self.p75 = self.sketch.quantiles()
+        return closed
+
+    def get_state(self) -> Dict:
+        return {
+            "sketch": self.sketch.get_state(),
+            "lots": [[wallet, list(lots)] for wallet, lots in self.lots.items()],
+            "last_ts": self.last_ts if self.last_ts != float("-inf") else None,
+            "last_hashes": sorted(self.last_hashes)
+        }
+
+    @classmethod
+    def from_state(cls, token_address: str, state: Dict) -> "TokenHoldTimes":
+        token = cls(token_address, QuantileSketch.from_state(state["sketch"]))
+        for wallet, lots in state["lots"]:
+            token.lots[wallet] = deque(lots, maxlen=cls.MAX_LOTS_PER_WALLET)
+        if state["last_ts"] is not None:
+            token.last_ts = state["last_ts"]
+        token.last_hashes = set(state["last_hashes"])
+        return token
+
+
+class HoldTimeIndex:
+    """
+    Per-token smart-money holding-time quantiles, updated incrementally from each newly
+    fetched TransferBatch and persisted in the Store (hold_times table). Reads are O(1):
+    the quantiles are cached per token and only recomputed when a hold completes.
+    """
+    def __init__(self, min_samples: int = Config.HOLD_TIME_MIN_SAMPLES, persist: bool = True):
+        self.min_samples = min_samples # Below this, callers should use their default
+        self.persist = persist
+        self._tokens: Dict[str, TokenHoldTimes] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def _token(self, token_address: str) -> TokenHoldTimes:
+        token = self._tokens.get(token_address)
+        if token is None:
+            state = None
+            if self.persist:
+                from data.store import Store
+                state = Store().get_hold_times(token_address)
+            token = TokenHoldTimes.from_state(token_address, state) if state else TokenHoldTimes(token_address)
+            self._tokens[token_address] = token
+        return token
+
+    def ingest(self, batch, wallet_index=None) -> int:
+        """
+        Updates the token's index from a TransferBatch. Only the sides that `wallet_index`
+        knows as smart money open or close lots; a smart-money-only query still returns the
+        DEX pools and other counterparties on the other side. Without any labels nothing is
+        ingested (and the watermark doesn't move, so the rows can be used once labels exist).
+        """
+        if not len(batch) or wallet_index is None or not len(wallet_index):
+            return 0
+        from_smart = wallet_index.contains_many(batch.from_address)
+        to_smart = wallet_index.contains_many(batch.to_address)
+
+        token = self._token(batch.token_address)
+        mark = (token.last_ts, len(token.last_hashes))
+        closed = token.ingest(batch.tx_hash, batch.from_address, batch.to_address, batch.timestamps,
+                              from_smart, to_smart)
+        if self.persist and (closed or (token.last_ts, len(token.last_hashes)) != mark):
+            from data.store import Store
+            Store().save_hold_times(token.token_address, token.samples, (token.p25, token.median, token.p75),
+                                    token.get_state())
+        return closed
+
+    def get(self, token_address: str) -> Optional[TokenHoldTimes]:
+        """
+        The token's hold-time stats (.p25, .median, .p75 in minutes, .samples),
+        or None until it has min_samples completed holds.
+        """
+        token = self._token(token_address)
+        return token if token.samples >= self.min_samples else None
+
+    def quantiles(self, token_address: str) -> Optional[Tuple[float, float, float]]:
+        token = self.get(token_address)
+        return (token.p25, token.median, token.p75) if token else None
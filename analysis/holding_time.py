@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterable
 import numpy as np
 from data.models import Transaction
 
@@ -39,10 +39,13 @@ class HoldingTimeAnalyzer:
         return float(np.median(durations))
 
     @staticmethod
-    def get_smart_money_median_hold_time(transactions: List[Transaction], smart_wallets: List[str]) -> float:
+    def get_smart_money_median_hold_time(transactions: List[Transaction], smart_wallets: Iterable[str]) -> float:
         """
         Filters transactions for smart wallets and calculates their collective median holding time.
+        `smart_wallets` can be any container (list, set or a WalletIndex); lists are converted to a set.
         """
+        if isinstance(smart_wallets, list):
+            smart_wallets = set(smart_wallets)
         # Group txs by wallet
         wallet_txs = {}
         for tx in transactions:
@@ -1,9 +1,73 @@
-from typing import List, Dict
+import weakref
+from collections import OrderedDict
+from typing import List, Dict, Optional
 from data.models import WalletScore, Transaction
+from config import Config
+
+def _write_scores(spill: Dict[str, WalletScore]):
+    if not spill:
+        return
+    from data.store import Store
+    Store().save_wallet_scores(list(spill.values()))
+    spill.clear()
+
+class ScoreCache:
+    """
+    LRU of WalletScores capped at max_size. Evicted scores are written to the Store
+    in batches and read back (and re-cached) on a miss, so nothing is lost; a partial
+    batch still waiting to be written is flushed when the cache is collected or at exit.
+    """
+    def __init__(self, max_size: int = Config.WALLET_SCORE_CACHE_SIZE, spill_batch: int = 256):
+        self.max_size = max_size
+        self.spill_batch = spill_batch
+        self._items: "OrderedDict[str, WalletScore]" = OrderedDict()
+        self._spill: Dict[str, WalletScore] = {} # Evicted, not yet written
+        # Holds only the spill dict, so the cache itself can still be garbage collected
+        weakref.finalize(self, _write_scores, self._spill)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, address: str) -> bool:
+        return self.get(address) is not None
+
+    def __setitem__(self, address: str, score: WalletScore):
+        self._items[address] = score
+        self._items.move_to_end(address)
+        self._spill.pop(address, None)
+        while self.max_size and len(self._items) > self.max_size:
+            old_address, old_score = self._items.popitem(last=False)
+            self._spill[old_address] = old_score
+        if len(self._spill) >= self.spill_batch:
+            self.flush()
+
+    def get(self, address: str) -> Optional[WalletScore]:
+        score = self._items.get(address)
+        if score is not None:
+            self._items.move_to_end(address)
+            return score
+        score = self._spill.get(address)
+        if score is None:
+            from data.store import Store
+            row = Store().get_wallet_score(address)
+            if row is None:
+                return None
+            score = WalletScore(**row)
+        self[address] = score
+        return score
+
+    def __getitem__(self, address: str) -> WalletScore:
+        score = self.get(address)
+        if score is None:
+            raise KeyError(address)
+        return score
+
+    def flush(self):
+        _write_scores(self._spill)
 
 class WalletScorer:
-    def __init__(self):
-        self.wallet_scores: Dict[str, WalletScore] = {}
+    def __init__(self, max_cached: int = Config.WALLET_SCORE_CACHE_SIZE):
+        self.wallet_scores = ScoreCache(max_size=max_cached)
 
     def score_wallet(self, address: str, historical_txs: List[Transaction]) -> WalletScore:
         """
@@ -35,6 +99,7 @@ class WalletScorer:
         return score
 
     def get_wallet_grade(self, address: str) -> str:
-        if address in self.wallet_scores:
-            return self.wallet_scores[address].grade
+        score = self.wallet_scores.get(address)
+        if score is not None:
+            return score.grade
         return "C" # Default unknown
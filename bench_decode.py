@@ -0,0 +1,32 @@
+import json
+import time
+import random
+from data.transfer_decoder import decode_transfers, iter_json_array_items
+
+def make_body(rows: int, malformed_every: int = 1000) -> bytes:
+    items = []
+    for i in range(rows):
+        items.append({
+            "tx_hash": f"tx_{i}",
+            "from_address": f"wallet_{random.randint(0, 5000)}",
+            "to_address": f"wallet_{random.randint(0, 5000)}",
+            "quantity": random.random() * 1e6,
+            "block_timestamp": "not-a-date" if i % malformed_every == 0 else f"2025-12-07T{i % 24:02d}:17:{i % 60:02d}" + ("Z" if i % 2 else ""),
+            "block_number": 300000000 + i
+        })
+    return json.dumps({"data": items, "pagination": {"page": 1}}).encode()
+
+def run_benchmark(rows: int = 200_000, chunk_size: int = 65536):
+    print(f"--- Transfer decode benchmark ({rows} rows) ---")
+    body = make_body(rows)
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+    start = time.perf_counter()
+    batch = decode_transfers(iter_json_array_items(chunks), "BenchToken")
+    elapsed = time.perf_counter() - start
+
+    print(f"Decoded {len(batch)} rows, rejected {batch.rejected}, in {elapsed:.3f}s")
+    print(f"Throughput: {rows / elapsed:,.0f} rows/s ({len(body) / elapsed / 1e6:.1f} MB/s)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -11,6 +11,44 @@ class Config:
     # Strategy Settings
     MIN_BUY_WAVE_SCORE = float(os.getenv("MIN_BUY_WAVE_SCORE", "7.5"))
     DEFAULT_STOP_LOSS = float(os.getenv("DEFAULT_STOP_LOSS", "0.10")) # 10%
+    DEFAULT_TAKE_PROFIT = float(os.getenv("DEFAULT_TAKE_PROFIT", "0.0")) # 0 = disabled, exit on timer only
+    
+    # Extra strategy variants sharing one data feed, JSON list, e.g.
+    # [{"id": "fast", "buy_wave_threshold": 5, "hold_fraction": 0.6, "stop_loss": 0.05}]
+    STRATEGY_VARIANTS = os.getenv("STRATEGY_VARIANTS", "[]")
+    
+    # Websocket price feed for intra-cycle stop-loss / take-profit exits (empty = disabled)
+    PRICE_STREAM_URL = os.getenv("PRICE_STREAM_URL", "")
+    
+    # Record fetched transfers, prices and discovery flows to SQLite so sweeps can replay them.
+    # Off by default; transfers are only kept while PRICE_STREAM_URL supplies prices to pair them with
+    RECORD_MARKET_DATA = os.getenv("RECORD_MARKET_DATA", "0") == "1"
+    
+    # Smart-money holding-time index: completed holds needed before a token's median replaces the default
+    HOLD_TIME_MIN_SAMPLES = int(os.getenv("HOLD_TIME_MIN_SAMPLES", "5"))
+    HOLD_TIME_DEFAULT_MINUTES = float(os.getenv("HOLD_TIME_DEFAULT_MINUTES", "240"))
+    LABEL_BUDGET = int(os.getenv("LABEL_BUDGET", "20")) # Wallet label API lookups per cycle for unseen counterparties
+
+    # Token discovery: {"chain": ["token", ...]} candidates ranked by smart-money net inflow (empty = fixed list)
+    DISCOVERY_CANDIDATES = os.getenv("DISCOVERY_CANDIDATES", "")
+    DISCOVERY_INTERVAL_SECONDS = float(os.getenv("DISCOVERY_INTERVAL_SECONDS", "900"))
+    DISCOVERY_LOOKBACK_HOURS = int(os.getenv("DISCOVERY_LOOKBACK_HOURS", "24"))
+    WATCHLIST_SIZE = int(os.getenv("WATCHLIST_SIZE", "20"))
+    WATCHLIST_HYSTERESIS = float(os.getenv("WATCHLIST_HYSTERESIS", "0.25")) # Inflow margin and rank slack
+    SCAN_BUDGET = int(os.getenv("SCAN_BUDGET", "10")) # Transfer fetches per cycle across the watchlist
+
+    # Memory caps for long-running processes (0 = unbounded)
+    TRADE_HISTORY_LIMIT = int(os.getenv("TRADE_HISTORY_LIMIT", "500")) # In-memory trades per book
+    WALLET_SCORE_CACHE_SIZE = int(os.getenv("WALLET_SCORE_CACHE_SIZE", "10000")) # LRU, overflow goes to SQLite
+    
+    # Profiling (also toggled at runtime with SIGUSR1)
+    PROFILE_CYCLES = int(os.getenv("PROFILE_CYCLES", "0")) # Profile next N cycles, -1 = every cycle
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    
+    # Warm restarts
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+    CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "300")) # 0 = only on shutdown
     
     # Nansen endpoints
     NANSEN_BASE_URL = "https://api.nansen.ai/api/v1"
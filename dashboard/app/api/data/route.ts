@@ -10,7 +10,8 @@ export async function GET() {
 
     const getTrades = () => {
         return new Promise((resolve, reject) => {
-            db.all("SELECT * FROM trades ORDER BY id DESC LIMIT 50", (err, rows) => {
+            // Main strategy only, like the portfolio card (variants log their own rows)
+            db.all("SELECT * FROM trades WHERE strategy_id = 'default' OR strategy_id IS NULL ORDER BY id DESC LIMIT 50", (err, rows) => {
                 if (err) reject(err);
                 else resolve(rows);
             });
@@ -19,8 +20,8 @@ export async function GET() {
 
     const getPortfolio = () => {
         return new Promise((resolve, reject) => {
-            // Get latest portfolio snapshot
-            db.get("SELECT * FROM portfolio ORDER BY id DESC LIMIT 1", (err, row) => {
+            // Get latest portfolio snapshot of the main strategy (variants log their own rows)
+            db.get("SELECT * FROM portfolio WHERE strategy_id = 'default' OR strategy_id IS NULL ORDER BY id DESC LIMIT 1", (err, row) => {
                 if (err) reject(err);
                 else resolve(row);
             });
@@ -45,12 +46,38 @@ export async function GET() {
         });
     };
 
+    // Analytics read-model (maintained by the bot on every trade / snapshot, so these stay cheap)
+    type Row = Record<string, string | number | null>;
+    const getAnalytics = () => {
+        const one = (sql: string, params: string[] = []) => new Promise<Row | null>((resolve) => {
+            db.get(sql, params, (err: Error | null, row: Row | undefined) => resolve(err || !row ? null : row));
+        });
+        const all = (sql: string) => new Promise<Row[]>((resolve) => {
+            db.all(sql, (err: Error | null, rows: Row[]) => resolve(err ? [] : rows));
+        });
+        const winRate = (row: Row) => Number(row.sells) ? Number(row.wins) / Number(row.sells) : 0;
+        const weekAgo = new Date(Date.now() - 6 * 86400 * 1000).toISOString().slice(0, 10);
+        return Promise.all([
+            one("SELECT * FROM strategy_summary WHERE strategy_id = 'default'"),
+            all("SELECT * FROM pnl_by_token WHERE strategy_id = 'default' ORDER BY realized_pnl DESC LIMIT 20"),
+            all("SELECT * FROM pnl_by_day WHERE strategy_id = 'default' ORDER BY day DESC LIMIT 30"),
+            one(`SELECT COALESCE(SUM(realized_pnl), 0) AS realized_pnl, COALESCE(SUM(sells), 0) AS sells,
+                COALESCE(SUM(wins), 0) AS wins, COALESCE(SUM(losses), 0) AS losses
+                FROM pnl_by_day WHERE strategy_id = 'default' AND day >= ?`, [weekAgo])
+        ]).then(([summary, by_token, by_day, last_7d]) => {
+            if (summary) summary.win_rate = winRate(summary);
+            if (last_7d) last_7d.win_rate = winRate(last_7d);
+            return { summary, by_token, by_day, last_7d };
+        });
+    };
+
     try {
-        const [trades, portfolio, heartbeat, logs] = await Promise.all([
+        const [trades, portfolio, heartbeat, logs, analytics] = await Promise.all([
             getTrades(),
             getPortfolio(),
             getHeartbeat() as Promise<{ timestamp: string } | null>,
-            getLogs()
+            getLogs(),
+            getAnalytics()
         ]);
 
         // Calculate Status Server-Side to avoid Clock Skew
@@ -71,6 +98,7 @@ export async function GET() {
             portfolio: portfolio || null,
             heartbeat: heartbeat || null,
             logs: logs || [],
+            analytics,
             status_data: {
                 is_online,
                 seconds_ago
@@ -1,47 +1,67 @@
 import requests
+import numpy as np
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from config import Config
 from data.models import WalletLabel, Transaction
+from data.wallet_index import WalletIndex, LABEL_CACHE_PREFIX, LABEL_TTL_SECONDS
+from data.transfer_decoder import TransferBatch, decode_transfers, iter_json_array_items
 
 class NansenClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, wallet_index: Optional[WalletIndex] = None):
         self.api_key = api_key
+        # Local smart-wallet index, built from the label cache on first use
+        self._wallet_index = wallet_index
         self.base_url = Config.NANSEN_BASE_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
 
-    def get_token_flows(self, token_address: str, start_date: str) -> List[Dict]:
+    def get_token_flows(self, token_address: str, start_date: str, chain: str = "solana") -> List[Dict]:
         """
         Mock implementation of Token Flows API.
         In a real scenario, this would hit the Nansen API to see inflow/outflow.
+        Rows are expected to carry `inflow`/`outflow` (or `net_flow`), see engine.discovery.net_flow.
         """
         # Placeholder logic
         # url = f"{self.base_url}/token_flows"
-        # params = {"token_address": token_address, "start_date": start_date}
+        # params = {"chain": chain, "token_address": token_address, "start_date": start_date}
         # response = requests.get(url, headers=self.headers, params=params)
         # return response.json()
-        print(f"Fetching token flows for {token_address} since {start_date}")
+        print(f"Fetching token flows for {token_address} on {chain} since {start_date}")
         return []
 
+    @property
+    def wallet_index(self) -> WalletIndex:
+        if self._wallet_index is None:
+            self._wallet_index = WalletIndex.from_store()
+        return self._wallet_index
+
     def get_wallet_labels(self, addresses: List[str]) -> List[WalletLabel]:
         """
         Returns labels for a list of addresses.
-        Uses Caching to save API credits.
+        Checks the local wallet index, then the cache, and only then the API.
+        Index entries past their TTL count as misses, so labels keep being refreshed.
         """
         from data.store import Store
         store = Store()
         
         results = []
         to_fetch = []
+        index = self.wallet_index
         
-        # Check Cache first
+        # Local index first (no I/O), then Cache
         for addr in addresses:
-            cached = store.get_cache_item(f"wallet_label:{addr}")
+            indexed = index.get_label(addr)
+            if indexed:
+                results.append(indexed)
+                continue
+            cached = store.get_cache_item(f"{LABEL_CACHE_PREFIX}{addr}")
             if cached:
-                results.append(WalletLabel(**cached))
+                wl = WalletLabel(**cached)
+                index.add(wl)
+                results.append(wl)
             else:
                 to_fetch.append(addr)
                 
@@ -73,22 +93,45 @@ class NansenClient:
                 wl = WalletLabel(address=addr, label=label, is_smart_money=is_smart)
                 results.append(wl)
                 
-                # Save to Cache (Long TTL for labels: 24h)
-                store.set_cache_item(f"wallet_label:{addr}", wl.__dict__, ttl_seconds=86400)
+                # Save to Cache (Long TTL for labels: 24h) and keep the index in step
+                store.set_cache_item(f"{LABEL_CACHE_PREFIX}{addr}", wl.__dict__, ttl_seconds=LABEL_TTL_SECONDS)
+                index.add(wl)
                 
             except Exception as e:
                 print(f"Error fetching label for {addr}: {e}")
                 # Fallback
                 results.append(WalletLabel(address=addr, label="Error", is_smart_money=False))
-            
+        
+        index.flush()
         return results
 
-    def get_smart_money_transactions(self, token_address: str, lookback_hours: int = 24) -> List[Transaction]:
+    def label_transfers(self, batch: TransferBatch, budget: int) -> int:
         """
-        Finds recent transactions by Smart Money wallets for a specific token.
-        Uses Nansen TGM endpoint.
+        Labels up to `budget` of the batch's unseen (or expired) addresses and returns how
+        many were looked up. Rows are filtered locally first: in a row that already has a
+        known smart wallet only that wallet can need a refresh, its counterparty (usually a
+        DEX pool) is never sent. Rows with no known smart side go first.
         """
-        print(f"Scanning for Smart Money txs in {token_address} (last {lookback_hours}h)...")
+        if budget <= 0 or not len(batch):
+            return 0
+        index = self.wallet_index
+        from_smart = index.contains_many(batch.from_address)
+        to_smart = index.contains_many(batch.to_address)
+        unknown = ~(from_smart | to_smart)
+        candidates = np.concatenate([batch.from_address[unknown], batch.to_address[unknown],
+                                     batch.from_address[from_smart], batch.to_address[to_smart]])
+        unseen = index.unseen(candidates)[:budget]
+        if unseen:
+            self.get_wallet_labels(unseen)
+        return len(unseen)
+
+    def get_smart_money_transfers(self, token_address: str, lookback_hours: int = 24,
+                                  per_page: int = 50, max_pages: int = 1, chain: str = "solana") -> TransferBatch:
+        """
+        Finds recent transfers by Smart Money wallets for a specific token, as a columnar TransferBatch.
+        Uses Nansen TGM endpoint. Response bodies are streamed and decoded straight into arrays.
+        """
+        print(f"Scanning for Smart Money txs in {token_address} on {chain} (last {lookback_hours}h)...")
         
         try:
             # Correct Endpoint from Docs: POST https://api.nansen.ai/api/v1/tgm/transfers
@@ -99,67 +142,53 @@ class NansenClient:
             now = datetime.utcnow()
             start_date = now - timedelta(hours=lookback_hours)
             
-            # Exact Payload from Docs
-            payload = {
-                "chain": "solana",
-                "token_address": token_address,
-                "date": {
-                    "from": start_date.strftime("%Y-%m-%d"),
-                    "to": now.strftime("%Y-%m-%d")
-                },
-                "filters": {
-                    "only_smart_money": True
-                },
-                "pagination": {
-                    "page": 1,
-                    "per_page": 50
-                }
-            }
-            
             headers = {
                 "Content-Type": "application/json",
                 "apiKey": self.api_key
             }
             
-            resp = requests.post(url, headers=headers, json=payload)
+            batches = []
+            for page in range(1, max_pages + 1):
+                # Exact Payload from Docs
+                payload = {
+                    "chain": chain,
+                    "token_address": token_address,
+                    "date": {
+                        "from": start_date.strftime("%Y-%m-%d"),
+                        "to": now.strftime("%Y-%m-%d")
+                    },
+                    "filters": {
+                        "only_smart_money": True
+                    },
+                    "pagination": {
+                        "page": page,
+                        "per_page": per_page
+                    }
+                }
+                
+                with requests.post(url, headers=headers, json=payload, stream=True) as resp:
+                    if resp.status_code != 200:
+                        print(f"Nansen API Error {resp.status_code}: {resp.text}")
+                        break
+                    batch = decode_transfers(iter_json_array_items(resp.iter_content(chunk_size=65536)), token_address)
+                
+                batches.append(batch)
+                if len(batch) + batch.rejected < per_page:
+                    break # Last page
             
-            txs = []
-            if resp.status_code == 200:
-                data = resp.json()
-                # Parse Nansen TGM response
-                for item in data.get('data', []):
-                    # Parse timestamp safely. API returns "block_timestamp"
-                    ts_str = item.get('block_timestamp') or item.get('timestamp')
-                    if ts_str:
-                        # Handle "2025-12-07T19:17:59" format (no Z)
-                        try:
-                            if isinstance(ts_str, str): # Ensure it's a string
-                                if 'Z' in ts_str:
-                                    ts = datetime.fromisoformat(ts_str.replace('Z', '+00:00'))
-                                else:
-                                    ts = datetime.fromisoformat(ts_str)
-                            else:
-                                ts = datetime.utcnow()
-                        except ValueError:
-                            ts = datetime.utcnow()
-                    else:
-                        ts = datetime.utcnow()
-
-                    tx = Transaction(
-                        tx_hash=item.get('tx_hash', 'unknown'),
-                        from_address=item.get('from_address'),
-                        to_address=item.get('to_address'),
-                        token_address=token_address,
-                        amount=float(item.get('quantity', 0) or item.get('transfer_amount', 0)),
-                        timestamp=ts,
-                        block_number=item.get('block_number', 0)
-                    )
-                    txs.append(tx)
-            else:
-                 print(f"Nansen API Error {resp.status_code}: {resp.text}")
-                 
-            return txs
+            if not batches:
+                return TransferBatch.empty(token_address)
+            result = TransferBatch.concat(batches)
+            if result.rejected:
+                print(f"Rejected {result.rejected} malformed transfer rows for {token_address}")
+            return result
             
         except Exception as e:
             print(f"Error fetching smart money txs: {e}")
-            return []
+            return TransferBatch.empty(token_address)
+
+    def get_smart_money_transactions(self, token_address: str, lookback_hours: int = 24) -> List[Transaction]:
+        """
+        Same as get_smart_money_transfers but materialized as Transaction objects.
+        """
+        return self.get_smart_money_transfers(token_address, lookback_hours).to_transactions()
@@ -1,8 +1,11 @@
 import sqlite3
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
+# Bump when the analytics summary tables change; the next Store() rebuilds them from trades/portfolio
+ANALYTICS_VERSION = "1"
+
 class Store:
     def __init__(self, db_path="bot_data.db"):
         self.db_path = db_path
@@ -54,10 +57,239 @@ class Store:
             level TEXT,
             timestamp DATETIME
         )''')
+
+
+        # Migrations: tag rows with the strategy that produced them (multi-strategy runs)
+        for table in ("trades", "portfolio"):
+            columns = [row[1] for row in c.execute(f"PRAGMA table_info({table})")]
+            if "strategy_id" not in columns:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN strategy_id TEXT DEFAULT 'default'")
+        # Unique id per trade, so journal replay can re-issue a write without duplicating it
+        if "trade_id" not in [row[1] for row in c.execute("PRAGMA table_info(trades)")]:
+            c.execute("ALTER TABLE trades ADD COLUMN trade_id TEXT")
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_trade_id ON trades (trade_id)")
+
+        # 6. Recorded market data for backtests / sweeps (epoch-second times for fast array loads)
+        c.execute('''CREATE TABLE IF NOT EXISTS transfers (
+            token_address TEXT,
+            tx_hash TEXT,
+            from_address TEXT,
+            to_address TEXT,
+            amount REAL,
+            timestamp REAL,
+            block_number INTEGER,
+            UNIQUE (token_address, tx_hash, from_address, to_address, timestamp)
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS prices (
+            token_address TEXT,
+            timestamp REAL,
+            price REAL,
+            PRIMARY KEY (token_address, timestamp)
+        )''')
+
+        # 7. Parameter Sweep Results
+        c.execute('''CREATE TABLE IF NOT EXISTS sweep_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            rank INTEGER,
+            params TEXT, -- JSON
+            pnl REAL,
+            win_rate REAL,
+            max_drawdown REAL,
+            trades INTEGER,
+            timestamp DATETIME
+        )''')
+
+        # 8. Wallet Scores (overflow for WalletScorer's in-memory LRU)
+        c.execute('''CREATE TABLE IF NOT EXISTS wallet_scores (
+            address TEXT PRIMARY KEY,
+            win_rate REAL,
+            avg_roi REAL,
+            median_holding_time_minutes REAL,
+            grade TEXT,
+            timestamp DATETIME
+        )''')
+
+        # 9. Cycle Profiles Table
+        c.execute('''CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            duration_seconds REAL,
+            samples INTEGER,
+            phases TEXT, -- JSON: phase -> % of samples
+            top_functions TEXT, -- JSON list
+            stack_file TEXT, -- Collapsed-stack file path
+            timestamp DATETIME
+        )''')
+
+        # 10. Holding-Time Index (per-token smart-money hold time sketch, see analysis/hold_time_index.py)
+        c.execute('''CREATE TABLE IF NOT EXISTS hold_times (
+            token_address TEXT PRIMARY KEY,
+            samples INTEGER,
+            p25_minutes REAL,
+            median_minutes REAL,
+            p75_minutes REAL,
+            state TEXT, -- JSON: sketch buckets, open lots, ingest watermark
+            timestamp DATETIME
+        )''')
+
+        # 11. Smart-money net inflow snapshots from token discovery (replayable, see engine/discovery.py)
+        c.execute('''CREATE TABLE IF NOT EXISTS token_flows (
+            chain TEXT,
+            token_address TEXT,
+            timestamp REAL, -- Epoch seconds
+            net_inflow REAL,
+            PRIMARY KEY (chain, token_address, timestamp)
+        )''')
+
+        # 12. Analytics read-model, maintained by add_trade / log_portfolio (see rebuild_analytics)
+        self._create_analytics_tables(c)
+        c.execute("SELECT value FROM system_status WHERE key = 'analytics_version'")
+        row = c.fetchone()
         
         conn.commit()
         conn.close()
 
+        if row is None or row[0] != ANALYTICS_VERSION:
+            self.rebuild_analytics()
+
+    def _create_analytics_tables(self, c):
+        c.execute('''CREATE TABLE IF NOT EXISTS pnl_by_token (
+            strategy_id TEXT,
+            token_address TEXT,
+            realized_pnl REAL DEFAULT 0,
+            buys INTEGER DEFAULT 0,
+            sells INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            volume_sol REAL DEFAULT 0,
+            last_trade DATETIME,
+            PRIMARY KEY (strategy_id, token_address)
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS pnl_by_day (
+            strategy_id TEXT,
+            day TEXT, -- UTC date, YYYY-MM-DD
+            realized_pnl REAL DEFAULT 0,
+            buys INTEGER DEFAULT 0,
+            sells INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            volume_sol REAL DEFAULT 0,
+            PRIMARY KEY (strategy_id, day)
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS strategy_summary (
+            strategy_id TEXT PRIMARY KEY,
+            realized_pnl REAL DEFAULT 0,
+            buys INTEGER DEFAULT 0,
+            sells INTEGER DEFAULT 0,
+            wins INTEGER DEFAULT 0,
+            losses INTEGER DEFAULT 0,
+            balance_sol REAL,
+            open_positions INTEGER DEFAULT 0,
+            open_exposure_sol REAL DEFAULT 0, -- At entry price
+            equity_sol REAL, -- balance + exposure
+            peak_equity_sol REAL,
+            max_drawdown REAL DEFAULT 0, -- Fraction of peak equity
+            updated DATETIME
+        )''')
+
+    def _apply_trade(self, c, strategy_id: str, token: str, trade_type: str, amount_sol: float,
+                     pnl: float, timestamp: str):
+        """
+        Folds one trade into the analytics tables (same transaction as the trade insert).
+        """
+        is_sell = trade_type == "SELL"
+        row = (0 if is_sell else 1, 1 if is_sell else 0, 1 if is_sell and pnl > 0 else 0,
+               1 if is_sell and pnl < 0 else 0, pnl if is_sell else 0.0, amount_sol or 0.0)
+        c.execute('''INSERT INTO pnl_by_token
+            (strategy_id, token_address, buys, sells, wins, losses, realized_pnl, volume_sol, last_trade)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (strategy_id, token_address) DO UPDATE SET
+                buys = buys + excluded.buys, sells = sells + excluded.sells,
+                wins = wins + excluded.wins, losses = losses + excluded.losses,
+                realized_pnl = realized_pnl + excluded.realized_pnl,
+                volume_sol = volume_sol + excluded.volume_sol, last_trade = excluded.last_trade''',
+            (strategy_id, token, *row, timestamp))
+        c.execute('''INSERT INTO pnl_by_day
+            (strategy_id, day, buys, sells, wins, losses, realized_pnl, volume_sol)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (strategy_id, day) DO UPDATE SET
+                buys = buys + excluded.buys, sells = sells + excluded.sells,
+                wins = wins + excluded.wins, losses = losses + excluded.losses,
+                realized_pnl = realized_pnl + excluded.realized_pnl,
+                volume_sol = volume_sol + excluded.volume_sol''',
+            (strategy_id, timestamp[:10], *row))
+        c.execute('''INSERT INTO strategy_summary
+            (strategy_id, buys, sells, wins, losses, realized_pnl, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (strategy_id) DO UPDATE SET
+                buys = buys + excluded.buys, sells = sells + excluded.sells,
+                wins = wins + excluded.wins, losses = losses + excluded.losses,
+                realized_pnl = realized_pnl + excluded.realized_pnl, updated = excluded.updated''',
+            (strategy_id, *row[:5], timestamp))
+
+    def _apply_portfolio(self, c, strategy_id: str, balance: float, open_positions: int,
+                         exposure: float, timestamp: str):
+        """
+        Updates exposure, equity and the running max drawdown from one portfolio snapshot.
+        """
+        equity = balance + exposure
+        c.execute('''INSERT INTO strategy_summary
+            (strategy_id, balance_sol, open_positions, open_exposure_sol, equity_sol, peak_equity_sol, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (strategy_id) DO UPDATE SET
+                balance_sol = excluded.balance_sol, open_positions = excluded.open_positions,
+                open_exposure_sol = excluded.open_exposure_sol, equity_sol = excluded.equity_sol,
+                peak_equity_sol = MAX(COALESCE(peak_equity_sol, excluded.equity_sol), excluded.equity_sol),
+                max_drawdown = MAX(max_drawdown, CASE
+                    WHEN MAX(COALESCE(peak_equity_sol, excluded.equity_sol), excluded.equity_sol) > 0
+                    THEN 1 - excluded.equity_sol / MAX(COALESCE(peak_equity_sol, excluded.equity_sol), excluded.equity_sol)
+                    ELSE 0 END),
+                updated = excluded.updated''',
+            (strategy_id, balance, open_positions, exposure, equity, equity, timestamp))
+
+    def rebuild_analytics(self):
+        """
+        Drops and recomputes the analytics tables from the full trades and portfolio history.
+        Run after changing their schema (bump ANALYTICS_VERSION) or to repair them.
+        The whole rebuild is one transaction, so a live bot's add_trade waits for it
+        instead of finding the tables dropped.
+        """
+        # Autocommit mode, otherwise sqlite3 commits the DROPs on its own
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            trades, snapshots = self._rebuild_analytics(c)
+            c.execute("COMMIT")
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return trades, snapshots
+
+    def _rebuild_analytics(self, c):
+        for table in ("pnl_by_token", "pnl_by_day", "strategy_summary"):
+            c.execute(f"DROP TABLE IF EXISTS {table}")
+        self._create_analytics_tables(c)
+
+        trades = c.execute('''SELECT strategy_id, token_address, type, amount, pnl, timestamp
+            FROM trades ORDER BY id''').fetchall()
+        for strategy_id, token, trade_type, amount, pnl, timestamp in trades:
+            self._apply_trade(c, strategy_id or "default", token, trade_type, amount, pnl or 0.0, timestamp or "")
+
+        snapshots = c.execute('''SELECT strategy_id, total_value_sol, active_positions, timestamp
+            FROM portfolio ORDER BY id''').fetchall()
+        for strategy_id, total, positions_json, timestamp in snapshots:
+            positions = json.loads(positions_json or "[]")
+            self._apply_portfolio(c, strategy_id or "default", total, len(positions),
+                                  sum(p.get("current_val", 0.0) for p in positions), timestamp)
+
+        c.execute("INSERT OR REPLACE INTO system_status (key, value, timestamp) VALUES (?, ?, ?)",
+                  ("analytics_version", ANALYTICS_VERSION, datetime.utcnow().isoformat() + "Z"))
+        return len(trades), len(snapshots)
+
     def add_log(self, message: str, level: str = "INFO"):
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
@@ -95,28 +327,57 @@ class Store:
             return datetime.fromisoformat(row[0])
         return None
 
-    def add_trade(self, trade_data: Dict):
+    def set_status(self, key: str, value: str):
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
-        c.execute('''INSERT INTO trades 
-            (token_address, type, amount, price, timestamp, pnl, pnl_percent, reasoning) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        c.execute("INSERT OR REPLACE INTO system_status (key, value, timestamp) VALUES (?, ?, ?)",
+                  (key, value, datetime.utcnow().isoformat() + "Z"))
+        conn.commit()
+        conn.close()
+
+    def get_status(self, key: str) -> Optional[str]:
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("SELECT value FROM system_status WHERE key = ?", (key,))
+        row = c.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def add_trade(self, trade_data: Dict) -> bool:
+        """
+        Records a trade and folds it into the analytics tables. A trade whose `id` is already
+        stored is ignored (returns False), which makes journal replay safe.
+        """
+        # Ensure we store naive datetimes as UTC ISO string with Z
+        timestamp = trade_data['time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ') if trade_data['time'].tzinfo is None else trade_data['time'].isoformat()
+        strategy_id = trade_data.get('strategy', "default")
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''INSERT OR IGNORE INTO trades 
+            (token_address, type, amount, price, timestamp, pnl, pnl_percent, reasoning, strategy_id, trade_id) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
             (
                 trade_data['token'],
                 trade_data['type'],
                 trade_data['amount_sol'],
                 trade_data['price'],
-                # Ensure we store naive datetimes as UTC ISO string with Z
-                trade_data['time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ') if trade_data['time'].tzinfo is None else trade_data['time'].isoformat(),
+                timestamp,
                 trade_data.get('pnl', 0.0),
                 trade_data.get('pnl_percent', 0.0),
-                trade_data.get('reasoning', "")
+                trade_data.get('reasoning', ""),
+                strategy_id,
+                trade_data.get('id')
             )
         )
+        inserted = c.rowcount > 0
+        if inserted:
+            self._apply_trade(c, strategy_id, trade_data['token'], trade_data['type'], trade_data['amount_sol'],
+                              trade_data.get('pnl', 0.0), timestamp)
         conn.commit()
         conn.close()
+        return inserted
 
-    def log_portfolio(self, total_value: float, positions: Dict):
+    def log_portfolio(self, total_value: float, positions: Dict, strategy_id: str = "default"):
         # Convert positions to JSON-friendly format
         pos_list = []
         for token, pos in positions.items():
@@ -128,27 +389,264 @@ class Store:
                 "target_exit": pos.target_exit_time.isoformat()
             })
             
+        timestamp = datetime.utcnow().isoformat() + "Z"
         conn = sqlite3.connect(self.db_path)
         c = conn.cursor()
-        c.execute("INSERT INTO portfolio (timestamp, total_value_sol, active_positions) VALUES (?, ?, ?)",
-                  (datetime.utcnow().isoformat() + "Z", total_value, json.dumps(pos_list)))
+        c.execute("INSERT INTO portfolio (timestamp, total_value_sol, active_positions, strategy_id) VALUES (?, ?, ?, ?)",
+                  (timestamp, total_value, json.dumps(pos_list), strategy_id))
+        self._apply_portfolio(c, strategy_id, total_value, len(pos_list),
+                              sum(p["current_val"] for p in pos_list), timestamp)
         conn.commit()
         conn.close()
 
-    def get_trades(self, limit=50) -> List[Dict]:
+    def get_trades(self, limit=50, strategy_id: Optional[str] = None) -> List[Dict]:
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT * FROM trades ORDER BY id DESC LIMIT ?", (limit,))
+        if strategy_id is None:
+            c.execute("SELECT * FROM trades ORDER BY id DESC LIMIT ?", (limit,))
+        else:
+            c.execute("SELECT * FROM trades WHERE strategy_id = ? ORDER BY id DESC LIMIT ?", (strategy_id, limit))
         rows = c.fetchall()
         conn.close()
         return [dict(row) for row in rows]
         
-    def get_portfolio_history(self, limit=100) -> List[Dict]:
+    # --- Analytics (constant-time reads from the summary tables) ---
+    def get_performance_summary(self, strategy_id: str = "default") -> Optional[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute("SELECT * FROM strategy_summary WHERE strategy_id = ?", (strategy_id,))
+        row = c.fetchone()
+        conn.close()
+        if not row:
+            return None
+        item = dict(row)
+        item["win_rate"] = item["wins"] / item["sells"] if item["sells"] else 0.0
+        return item
+
+    def get_pnl_by_token(self, strategy_id: str = "default", limit: int = 50) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('''SELECT * FROM pnl_by_token WHERE strategy_id = ?
+            ORDER BY realized_pnl DESC LIMIT ?''', (strategy_id, limit))
+        rows = c.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def get_pnl_by_day(self, strategy_id: str = "default", days: int = 30) -> List[Dict]:
+        """
+        Newest day first; only days with trades have rows.
+        """
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
-        c.execute("SELECT * FROM portfolio ORDER BY id DESC LIMIT ?", (limit,))
+        c.execute("SELECT * FROM pnl_by_day WHERE strategy_id = ? ORDER BY day DESC LIMIT ?", (strategy_id, days))
+        rows = c.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def get_window_stats(self, strategy_id: str = "default", days: int = 7) -> Dict:
+        """
+        Realized PnL, trade counts and win rate over the last `days` UTC days (at most `days` rows read).
+        """
+        since = (datetime.utcnow() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''SELECT COALESCE(SUM(realized_pnl), 0), COALESCE(SUM(buys), 0), COALESCE(SUM(sells), 0),
+            COALESCE(SUM(wins), 0), COALESCE(SUM(losses), 0)
+            FROM pnl_by_day WHERE strategy_id = ? AND day >= ?''', (strategy_id, since))
+        pnl, buys, sells, wins, losses = c.fetchone()
+        conn.close()
+        return {"days": days, "realized_pnl": pnl, "buys": buys, "sells": sells, "wins": wins, "losses": losses,
+                "win_rate": wins / sells if sells else 0.0}
+
+    def add_profile(self, name: str, duration: float, summary: Dict, stack_file: str):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''INSERT INTO profiles
+            (name, duration_seconds, samples, phases, top_functions, stack_file, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (name, duration, summary["samples"], json.dumps(summary["phases"]),
+             json.dumps(summary["top_functions"]), stack_file, datetime.utcnow().isoformat() + "Z"))
+        # Keep only last 200 profiles
+        c.execute("DELETE FROM profiles WHERE id NOT IN (SELECT id FROM profiles ORDER BY id DESC LIMIT 200)")
+        conn.commit()
+        conn.close()
+
+    def get_profiles(self, limit: int = 20) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute("SELECT * FROM profiles ORDER BY id DESC LIMIT ?", (limit,))
+        rows = c.fetchall()
+        conn.close()
+        results = []
+        for row in rows:
+            item = dict(row)
+            item["phases"] = json.loads(item["phases"])
+            item["top_functions"] = json.loads(item["top_functions"])
+            results.append(item)
+        return results
+
+    def get_portfolio_history(self, limit=100, strategy_id: Optional[str] = None) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        if strategy_id is None:
+            c.execute("SELECT * FROM portfolio ORDER BY id DESC LIMIT ?", (limit,))
+        else:
+            c.execute("SELECT * FROM portfolio WHERE strategy_id = ? ORDER BY id DESC LIMIT ?", (strategy_id, limit))
+        rows = c.fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    # --- Market Data Methods ---
+    def add_transfers(self, batch):
+        """
+        Records a TransferBatch. Rows already stored are ignored.
+        """
+        if not len(batch):
+            return
+        rows = zip([batch.token_address] * len(batch), batch.tx_hash.tolist(), batch.from_address.tolist(),
+                   batch.to_address.tolist(), batch.amount.tolist(), batch.timestamps.tolist(),
+                   batch.block_number.tolist())
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.executemany('''INSERT OR IGNORE INTO transfers
+            (token_address, tx_hash, from_address, to_address, amount, timestamp, block_number)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''', rows)
+        conn.commit()
+        conn.close()
+
+    def add_prices(self, token_address: str, timestamps: List[float], prices: List[float]):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.executemany("INSERT OR REPLACE INTO prices (token_address, timestamp, price) VALUES (?, ?, ?)",
+                      [(token_address, float(ts), float(p)) for ts, p in zip(timestamps, prices)])
+        conn.commit()
+        conn.close()
+
+    def get_market_history(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Returns {token: {"transfer_ts": [...], "price_ts": [...], "prices": [...]}}, each sorted by time.
+        """
+        start = float("-inf") if start is None else start
+        end = float("inf") if end is None else end
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        history: Dict[str, Dict] = {}
+        c.execute("SELECT token_address, timestamp FROM transfers WHERE timestamp BETWEEN ? AND ? ORDER BY token_address, timestamp",
+                  (start, end))
+        for token, ts in c.fetchall():
+            history.setdefault(token, {"transfer_ts": [], "price_ts": [], "prices": []})["transfer_ts"].append(ts)
+        c.execute("SELECT token_address, timestamp, price FROM prices WHERE timestamp BETWEEN ? AND ? ORDER BY token_address, timestamp",
+                  (start, end))
+        for token, ts, price in c.fetchall():
+            entry = history.setdefault(token, {"transfer_ts": [], "price_ts": [], "prices": []})
+            entry["price_ts"].append(ts)
+            entry["prices"].append(price)
+        conn.close()
+        return history
+
+    def add_sweep_results(self, run_id: str, results: List[Dict]):
+        now = datetime.utcnow().isoformat() + "Z"
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.executemany('''INSERT INTO sweep_results
+            (run_id, rank, params, pnl, win_rate, max_drawdown, trades, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+            [(run_id, rank, json.dumps(r["params"]), r["pnl"], r["win_rate"], r["max_drawdown"], r["trades"], now)
+             for rank, r in enumerate(results, 1)])
+        conn.commit()
+        conn.close()
+
+    def get_sweep_results(self, run_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        if run_id is None:
+            c.execute("SELECT run_id FROM sweep_results ORDER BY id DESC LIMIT 1")
+            row = c.fetchone()
+            run_id = row["run_id"] if row else None
+        c.execute("SELECT * FROM sweep_results WHERE run_id = ? ORDER BY rank LIMIT ?", (run_id, limit))
+        rows = [dict(row) for row in c.fetchall()]
+        conn.close()
+        for row in rows:
+            row["params"] = json.loads(row["params"])
+        return rows
+
+    # --- Wallet Score Methods ---
+    def save_wallet_scores(self, scores: List):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        now = datetime.utcnow().isoformat() + "Z"
+        c.executemany('''INSERT OR REPLACE INTO wallet_scores
+            (address, win_rate, avg_roi, median_holding_time_minutes, grade, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)''',
+            [(s.address, s.win_rate, s.avg_roi, s.median_holding_time_minutes, s.grade, now) for s in scores])
+        conn.commit()
+        conn.close()
+
+    def get_wallet_score(self, address: str) -> Optional[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute("SELECT address, win_rate, avg_roi, median_holding_time_minutes, grade FROM wallet_scores WHERE address = ?",
+                  (address,))
+        row = c.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def add_token_flows(self, chain: str, timestamp: float, flows: Dict[str, float]):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.executemany("INSERT OR REPLACE INTO token_flows (chain, token_address, timestamp, net_inflow) VALUES (?, ?, ?, ?)",
+                      [(chain, token, timestamp, float(flow)) for token, flow in flows.items()])
+        conn.commit()
+        conn.close()
+
+    def get_token_flows(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Returns {chain: {token: [[timestamp, net_inflow], ...]}}, each sorted by time.
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''SELECT chain, token_address, timestamp, net_inflow FROM token_flows
+            WHERE timestamp >= ? AND timestamp <= ? ORDER BY chain, token_address, timestamp''',
+            (start if start is not None else float("-inf"), end if end is not None else float("inf")))
+        flows: Dict[str, Dict] = {}
+        for chain, token, ts, flow in c.fetchall():
+            flows.setdefault(chain, {}).setdefault(token, []).append([ts, flow])
+        conn.close()
+        return flows
+
+    # --- Holding-Time Index Methods ---
+    def save_hold_times(self, token_address: str, samples: int, quantiles: tuple, state: Dict):
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute('''INSERT OR REPLACE INTO hold_times
+            (token_address, samples, p25_minutes, median_minutes, p75_minutes, state, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (token_address, samples, *quantiles, json.dumps(state), datetime.utcnow().isoformat() + "Z"))
+        conn.commit()
+        conn.close()
+
+    def get_hold_times(self, token_address: str) -> Optional[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("SELECT state FROM hold_times WHERE token_address = ?", (token_address,))
+        row = c.fetchone()
+        conn.close()
+        return json.loads(row[0]) if row else None
+
+    def get_hold_time_summary(self, limit: int = 100) -> List[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        c = conn.cursor()
+        c.execute('''SELECT token_address, samples, p25_minutes, median_minutes, p75_minutes, timestamp
+            FROM hold_times ORDER BY samples DESC LIMIT ?''', (limit,))
         rows = c.fetchall()
         conn.close()
         return [dict(row) for row in rows]
@@ -171,6 +669,21 @@ class Store:
                 return None
         return None
 
+    def get_cache_items(self, prefix: str, with_expiry: bool = False) -> List[tuple]:
+        """
+        Returns (key, value) for every unexpired cache entry whose key starts with prefix,
+        or (key, value, expiry as epoch seconds) with `with_expiry`.
+        """
+        conn = sqlite3.connect(self.db_path)
+        c = conn.cursor()
+        c.execute("SELECT key, value, expiry FROM cache WHERE substr(key, 1, ?) = ? AND expiry > ?",
+                  (len(prefix), prefix, datetime.now().isoformat()))
+        rows = c.fetchall()
+        conn.close()
+        if with_expiry:
+            return [(key, json.loads(value), datetime.fromisoformat(expiry).timestamp()) for key, value, expiry in rows]
+        return [(key, json.loads(value)) for key, value, _ in rows]
+
     def set_cache_item(self, key: str, value: Dict, ttl_seconds: int = 3600):
         # Default TTL 1 hour
         expiry = datetime.now().timestamp() + ttl_seconds
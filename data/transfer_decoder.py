@@ -0,0 +1,317 @@
+import json
+import codecs
+import warnings
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, Optional
+import numpy as np
+from data.models import Transaction
+
+_WS = " \t\r\n,"
+_decoder = json.JSONDecoder()
+_FALLBACK_BLOCK = 256
+
+# Fast timestamp path: fixed-width byte rows, digit columns of YYYY-MM-DDTHH:MM:SS
+_TS_WIDTH = 40
+_DIGIT_COLS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _find_top_level_array(buf: str, key: str, state: dict) -> int:
+    """
+    Scans `buf` from state["pos"] for `"key": [` directly inside the top-level object,
+    skipping strings and anything nested deeper (e.g. {"meta": {"data": [...]}}).
+    Returns the index just past the "[", or -1 after consuming the whole buffer; the
+    scan state carries over so the next call resumes with the next chunk appended.
+    """
+    i = state["pos"]
+    while i < len(buf):
+        c = buf[i]
+        if state["in_str"]:
+            if state["escape"]:
+                state["escape"] = False
+            elif c == "\\":
+                state["escape"] = True
+            elif c == '"':
+                state["in_str"] = False
+                state["last_str"] = buf[state["str_start"]:i]
+        elif c == '"':
+            state["in_str"] = True
+            state["str_start"] = i + 1
+        elif c == ":":
+            state["key"] = state["last_str"] if state["depth"] == 1 else None
+        elif c in "{[":
+            if c == "[" and state["key"] == key:
+                return i + 1
+            state["depth"] += 1
+            state["key"] = None
+        elif c in "}]":
+            state["depth"] -= 1
+            state["key"] = None
+        elif c not in " \t\r\n":
+            state["key"] = None # Some other value (or a comma) follows the key
+        i += 1
+    state["pos"] = i
+    return -1
+
+
+def iter_json_array_items(chunks: Iterable[bytes], key: str = "data") -> Iterator:
+    """
+    Incrementally yields the items of the top-level `key` array from a streamed JSON body,
+    so a large page is parsed as it arrives instead of after resp.json() builds the whole tree.
+    Items are yielded as decoded; if the stream ends with an item still undecodable (a torn
+    or malformed body) its raw text is yielded instead, so the caller can count it.
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    in_array = False
+    scan = {"pos": 0, "depth": 0, "in_str": False, "escape": False, "str_start": 0, "last_str": None, "key": None}
+
+    for chunk in chunks:
+        buf = buf[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        if not in_array:
+            start = _find_top_level_array(buf, key, scan)
+            if start < 0:
+                continue
+            in_array = True
+            pos = start
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break # Item split across chunks, wait for more data
+            pos = end
+            yield item
+
+    leftover = buf[pos:].strip(_WS)
+    if in_array and leftover:
+        yield leftover
+
+
+class TransferBatch:
+    """
+    Columnar batch of transfers for one token: parallel arrays, no per-row objects.
+    `timestamps` are UTC epoch seconds (float64). `rejected` counts rows dropped
+    because of a missing/malformed timestamp or amount.
+    """
+    def __init__(self, token_address: str, tx_hash: np.ndarray, from_address: np.ndarray,
+                 to_address: np.ndarray, amount: np.ndarray, timestamps: np.ndarray,
+                 block_number: np.ndarray, rejected: int = 0):
+        self.token_address = token_address
+        self.tx_hash = tx_hash
+        self.from_address = from_address
+        self.to_address = to_address
+        self.amount = amount
+        self.timestamps = timestamps
+        self.block_number = block_number
+        self.rejected = rejected
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def empty(cls, token_address: str) -> "TransferBatch":
+        return cls(token_address, np.empty(0, dtype=object), np.empty(0, dtype=object),
+                   np.empty(0, dtype=object), np.empty(0), np.empty(0), np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def concat(cls, batches: List["TransferBatch"]) -> "TransferBatch":
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            batches[0].token_address,
+            *(np.concatenate([getattr(b, name) for b in batches])
+              for name in ("tx_hash", "from_address", "to_address", "amount", "timestamps", "block_number")),
+            rejected=sum(b.rejected for b in batches)
+        )
+
+    @classmethod
+    def from_transactions(cls, token_address: str, txs: List[Transaction]) -> "TransferBatch":
+        ts = [tx.timestamp.replace(tzinfo=timezone.utc).timestamp() if tx.timestamp.tzinfo is None
+              else tx.timestamp.timestamp() for tx in txs]
+        return cls(
+            token_address,
+            np.array([tx.tx_hash for tx in txs], dtype=object),
+            np.array([tx.from_address for tx in txs], dtype=object),
+            np.array([tx.to_address for tx in txs], dtype=object),
+            np.array([tx.amount for tx in txs], dtype=np.float64),
+            np.array(ts, dtype=np.float64),
+            np.array([tx.block_number for tx in txs], dtype=np.int64)
+        )
+
+    def to_transactions(self) -> List[Transaction]:
+        """
+        Materializes Transaction objects (naive UTC timestamps) for callers that still want them.
+        """
+        return [
+            Transaction(
+                tx_hash=self.tx_hash[i],
+                from_address=self.from_address[i],
+                to_address=self.to_address[i],
+                token_address=self.token_address,
+                amount=float(self.amount[i]),
+                timestamp=datetime.fromtimestamp(self.timestamps[i], timezone.utc).replace(tzinfo=None),
+                block_number=int(self.block_number[i])
+            )
+            for i in range(len(self))
+        ]
+
+    def latest_timestamp(self) -> Optional[float]:
+        return float(self.timestamps.max()) if len(self) else None
+
+
+def _days_from_civil(y: np.ndarray, m: np.ndarray, d: np.ndarray) -> np.ndarray:
+    # Howard Hinnant's days_from_civil, vectorized
+    y = y - (m <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400
+    doy = (153 * (m + np.where(m > 2, -3, 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _parse_iso_fast(arr: np.ndarray) -> tuple:
+    """
+    Vectorized parser for the layout Nansen actually sends:
+    YYYY-MM-DD[T ]HH:MM:SS[.ffffff][Z]. Works on the raw bytes as a uint8 matrix.
+    Returns (epoch seconds, ok mask); rows that don't match exactly are left for the slow path.
+    """
+    n = len(arr)
+    m = arr.view(np.uint8).reshape(n, _TS_WIDTH).astype(np.int64)
+    digit = (m >= 48) & (m <= 57)
+    v = m - 48
+
+    ok = digit[:, _DIGIT_COLS].all(axis=1)
+    ok &= (m[:, 4] == 45) & (m[:, 7] == 45) & ((m[:, 10] == 84) | (m[:, 10] == 32))
+    ok &= (m[:, 13] == 58) & (m[:, 16] == 58) & (m[:, _TS_WIDTH - 1] == 0)
+
+    year = v[:, 0] * 1000 + v[:, 1] * 100 + v[:, 2] * 10 + v[:, 3]
+    month = v[:, 5] * 10 + v[:, 6]
+    day = v[:, 8] * 10 + v[:, 9]
+    hour = v[:, 11] * 10 + v[:, 12]
+    minute = v[:, 14] * 10 + v[:, 15]
+    second = v[:, 17] * 10 + v[:, 18]
+    ok &= (month >= 1) & (month <= 12) & (hour < 24) & (minute < 60) & (second < 61)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _DAYS_IN_MONTH[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+    ok &= (day >= 1) & (day <= month_days)
+
+    # Optional fraction: '.' then a run of digits (first 6 used, rest ignored)
+    has_frac = m[:, 19] == 46
+    run = np.cumprod(digit[:, 20:_TS_WIDTH - 1], axis=1).sum(axis=1)
+    weights = 10 ** np.arange(5, -1, -1)
+    frac_digits = v[:, 20:26] * (np.arange(6) < run[:, None])
+    micros = np.where(has_frac, (frac_digits * weights).sum(axis=1), 0)
+
+    # Terminator: end of string or 'Z' then end
+    term = np.where(has_frac, 20 + run, 19)
+    rows = np.arange(n)
+    term_ch = m[rows, np.minimum(term, _TS_WIDTH - 1)]
+    after_z = m[rows, np.minimum(term + 1, _TS_WIDTH - 1)]
+    ok &= (term_ch == 0) | ((term_ch == 90) & (after_z == 0))
+    ok &= ~has_frac | (run > 0)
+
+    days = _days_from_civil(year, month, day)
+    epoch = (days * 86400 + hour * 3600 + minute * 60 + second).astype(np.float64) + micros / 1e6
+    return epoch, ok
+
+
+def _parse_iso_slow(values: np.ndarray) -> np.ndarray:
+    """
+    NumPy's generic ISO parser (handles offsets and date-only values), in blocks;
+    value by value only inside blocks that contain something malformed.
+    """
+    parsed = np.empty(len(values), dtype="datetime64[us]")
+    with warnings.catch_warnings():
+        # Trailing 'Z' / '+00:00' are applied by NumPy but trigger a timezone warning
+        warnings.simplefilter("ignore")
+        for lo in range(0, len(values), _FALLBACK_BLOCK):
+            block = values[lo:lo + _FALLBACK_BLOCK]
+            try:
+                parsed[lo:lo + len(block)] = block.astype("datetime64[us]")
+                continue
+            except ValueError:
+                pass
+            for i, value in enumerate(block, lo):
+                try:
+                    parsed[i] = np.datetime64(value, "us")
+                except ValueError:
+                    parsed[i] = np.datetime64("NaT")
+    epoch = parsed.astype(np.int64).astype(np.float64) / 1e6
+    epoch[np.isnat(parsed)] = np.nan
+    return epoch
+
+
+def parse_iso_timestamps(values: List[str]) -> np.ndarray:
+    """
+    Bulk ISO-8601 -> UTC epoch seconds (naive values are taken as UTC).
+    Unparseable or empty values become NaN.
+    """
+    if not values:
+        return np.empty(0)
+    try:
+        raw = np.array(values, dtype=f"S{_TS_WIDTH}")
+    except UnicodeEncodeError:
+        return _parse_iso_slow(np.array(values, dtype=str))
+
+    epoch, ok = _parse_iso_fast(raw)
+    if not ok.all():
+        bad = np.flatnonzero(~ok)
+        epoch[bad] = _parse_iso_slow(np.array([values[i] for i in bad], dtype=str))
+    return epoch
+
+
+def decode_transfers(items: Iterable[dict], token_address: str) -> TransferBatch:
+    """
+    Decodes Nansen TGM transfer items straight into columns.
+    Rows with a missing/unusable timestamp or amount, or a non-integer block number,
+    are rejected and counted, never stamped "now" or zero-filled.
+    """
+    hashes, froms, tos, amounts, ts_values, blocks = [], [], [], [], [], []
+    rejected = 0
+    for item in items:
+        if not isinstance(item, dict):
+            rejected += 1 # Not a transfer object (or a torn item left at the end of the stream)
+            continue
+        ts = item.get('block_timestamp') or item.get('timestamp')
+        raw_amount = item.get('quantity')
+        if raw_amount is None:
+            raw_amount = item.get('transfer_amount')
+        try:
+            amount = float(raw_amount)
+            block = int(item.get('block_number') or 0)
+        except (TypeError, ValueError, OverflowError):
+            rejected += 1
+            continue
+        if not isinstance(ts, str) or not ts or amount != amount or not -2**63 <= block < 2**63:
+            rejected += 1
+            continue
+        hashes.append(item.get('tx_hash', 'unknown'))
+        froms.append(item.get('from_address'))
+        tos.append(item.get('to_address'))
+        amounts.append(amount)
+        ts_values.append(ts)
+        blocks.append(block)
+
+    timestamps = parse_iso_timestamps(ts_values)
+    ok = ~np.isnan(timestamps)
+    rejected += int((~ok).sum())
+
+    return TransferBatch(
+        token_address,
+        np.array(hashes, dtype=object)[ok],
+        np.array(froms, dtype=object)[ok],
+        np.array(tos, dtype=object)[ok],
+        np.array(amounts, dtype=np.float64)[ok],
+        timestamps[ok],
+        np.array(blocks, dtype=np.int64)[ok],
+        rejected=rejected
+    )
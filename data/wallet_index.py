@@ -0,0 +1,311 @@
+import os
+import sys
+import math
+import time
+import struct
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from data.models import WalletLabel
+
+LABEL_CACHE_PREFIX = "wallet_label:"
+LABEL_TTL_SECONDS = 86400 # Labels are re-fetched after a day
+
+# Bloom file layout: fixed header followed by the raw bit array
+_HEADER = struct.Struct("<4sIQIQ") # magic, version, m (bits), k (hashes), count
+_MAGIC = b"WBLM"
+_VERSION = 1
+
+# Addresses are hashed as fixed-width byte strings (Solana base58 <= 44 chars, EVM = 42)
+_ADDR_WIDTH = 48
+_WORDS = _ADDR_WIDTH // 8
+
+_SEED_1 = np.uint64(0xcbf29ce484222325)
+_SEED_2 = np.uint64(0x9e3779b97f4a7c15)
+_MULT = np.uint64(0x100000001b3)
+_MIX = np.uint64(0xff51afd7ed558ccd)
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    h ^= h >> np.uint64(33)
+    h *= _MIX
+    h ^= h >> np.uint64(33)
+    return h
+
+
+def hash_addresses(addresses) -> tuple:
+    """
+    Vectorized 64-bit hashes (h1, h2) for an array of addresses.
+    Deterministic across processes, unlike Python's salted hash().
+    """
+    arr = np.asarray(addresses, dtype=f"S{_ADDR_WIDTH}")
+    words = arr.view(np.uint64).reshape(-1, _WORDS)
+    h1 = np.full(len(arr), _SEED_1, dtype=np.uint64)
+    h2 = np.full(len(arr), _SEED_2, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i in range(_WORDS):
+            h1 ^= words[:, i]
+            h1 *= _MULT
+            h2 += words[:, i]
+            h2 = _mix(h2)
+        h1 = _mix(h1)
+    return h1, h2 | np.uint64(1) # Odd step so the k probes never collapse
+
+
+class BloomFilter:
+    """
+    Bit-array Bloom filter, optionally backed by a memory-mapped file so it
+    is available immediately at startup and survives restarts.
+    """
+    def __init__(self, num_bits: int, num_hashes: int, path: Optional[str] = None, count: int = 0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.path = path
+        num_bytes = (num_bits + 7) // 8
+
+        if path:
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, _VERSION, num_bits, num_hashes, count))
+                    f.truncate(_HEADER.size + num_bytes)
+            self.bits = np.memmap(path, dtype=np.uint8, mode="r+", offset=_HEADER.size, shape=(num_bytes,))
+        else:
+            self.bits = np.zeros(num_bytes, dtype=np.uint8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float = 0.001, path: Optional[str] = None) -> "BloomFilter":
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        return cls(num_bits, num_hashes, path=path)
+
+    @classmethod
+    def open(cls, path: str) -> Optional["BloomFilter"]:
+        """
+        Memory-maps an existing filter file. Returns None if missing or unreadable.
+        """
+        try:
+            with open(path, "rb") as f:
+                magic, version, num_bits, num_hashes, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                return None
+            if os.path.getsize(path) < _HEADER.size + (num_bits + 7) // 8:
+                return None
+            return cls(num_bits, num_hashes, path=path, count=count)
+        except (OSError, struct.error):
+            return None
+
+    def _positions(self, addresses) -> np.ndarray:
+        h1, h2 = hash_addresses(addresses)
+        m = np.uint64(self.num_bits)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h1[:, None] + steps[None, :] * h2[:, None]) % m
+
+    def add_many(self, addresses: Sequence[str]):
+        if not len(addresses):
+            return
+        pos = self._positions(addresses).ravel()
+        np.bitwise_or.at(self.bits, pos >> np.uint64(3), (1 << (pos & np.uint64(7))).astype(np.uint8))
+        self.count += len(addresses)
+
+    def contains_many(self, addresses) -> np.ndarray:
+        """
+        Bool mask: False means definitely absent, True means probably present.
+        """
+        if not len(addresses):
+            return np.zeros(0, dtype=bool)
+        pos = self._positions(addresses)
+        hits = self.bits[pos >> np.uint64(3)] & (1 << (pos & np.uint64(7))).astype(np.uint8)
+        return hits.all(axis=1)
+
+    def flush(self):
+        if self.path:
+            self.bits.flush()
+            with open(self.path, "r+b") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, self.num_bits, self.num_hashes, self.count))
+
+
+class WalletIndex:
+    """
+    Local membership index of labelled wallets built from the label cache.
+
+    Every labelled address gets an interned integer id. Smart-money / fund / whale
+    wallets are also kept in an exact id set and in a persisted Bloom filter, so raw
+    transfer columns can be prefiltered in bulk before any label API call.
+
+    The exact set is loaded from the label cache lazily: until then, lookups go through
+    the memory-mapped Bloom filter and a batch without any hits never touches SQLite.
+    """
+    def __init__(self, bloom_path: Optional[str] = "wallet_index.bloom", capacity: int = 1_000_000,
+                 error_rate: float = 0.001):
+        self.bloom_path = bloom_path
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.ids: Dict[str, int] = {}
+        self.addresses: List[str] = []
+        self.labels: List[str] = []
+        self.expires: List[float] = [] # Epoch seconds; past it the label counts as unseen again
+        self.smart_ids: set = set()
+        self._store = None
+        self._loaded = False
+
+        self.bloom = BloomFilter.open(bloom_path) if bloom_path else None
+        # A fresh filter knows nothing yet, so the exact set has to be loaded to fill it
+        self._bloom_ready = self.bloom is not None and self.bloom.count <= self.capacity
+        if not self._bloom_ready:
+            self._new_bloom()
+
+    def _new_bloom(self):
+        if self.bloom_path and os.path.exists(self.bloom_path):
+            os.remove(self.bloom_path)
+        self.bloom = BloomFilter.for_capacity(self.capacity, self.error_rate, path=self.bloom_path)
+
+    def _resize(self, smart: List[str]):
+        """
+        Rewrites the Bloom filter at the current capacity with exactly `smart`.
+        """
+        self._new_bloom()
+        self.bloom.add_many(smart)
+        self.bloom.flush()
+
+    @classmethod
+    def from_store(cls, store=None, **kwargs) -> "WalletIndex":
+        """
+        Opens the index; the exact set is only read from the label cache on first need
+        (straight away if there is no usable Bloom filter on disk).
+        """
+        index = cls(**kwargs)
+        index._store = store
+        if not index._bloom_ready:
+            index.rebuild(store)
+        return index
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.rebuild(self._store)
+
+    def rebuild(self, store=None):
+        """
+        Reloads the exact set from every unexpired cached label. The Bloom filter
+        is only rewritten if it is missing entries (e.g. first run or a new file)
+        or holds more than its capacity.
+        """
+        if store is None:
+            from data.store import Store
+            store = Store()
+        self.ids.clear()
+        self.addresses.clear()
+        self.labels.clear()
+        self.expires.clear()
+        self.smart_ids.clear()
+
+        for key, value, expiry in store.get_cache_items(LABEL_CACHE_PREFIX, with_expiry=True):
+            self._add_exact(value.get("address") or key[len(LABEL_CACHE_PREFIX):],
+                            value.get("label", "Unknown"), value.get("is_smart_money", False), expiry)
+
+        self._loaded = True
+
+        smart = [self.addresses[i] for i in self.smart_ids]
+        if len(smart) > self.capacity:
+            self.capacity = len(smart) * 2
+            self._resize(smart)
+        elif self.bloom.count > self.capacity or (smart and not self.bloom.contains_many(smart).all()):
+            self._resize(smart)
+        self._bloom_ready = True
+
+    def _add_exact(self, address: str, label: str, is_smart_money: bool, expires: float) -> int:
+        wallet_id = self.ids.get(address)
+        if wallet_id is None:
+            wallet_id = len(self.addresses)
+            address = sys.intern(address)
+            self.ids[address] = wallet_id
+            self.addresses.append(address)
+            self.labels.append(label)
+            self.expires.append(expires)
+        else:
+            self.labels[wallet_id] = label
+            self.expires[wallet_id] = expires
+
+        if is_smart_money:
+            self.smart_ids.add(wallet_id)
+        else:
+            self.smart_ids.discard(wallet_id)
+        return wallet_id
+
+    def add(self, label: WalletLabel, expires: Optional[float] = None):
+        """
+        Incremental update, called whenever a label is fetched or refreshed.
+        A wallet that loses its smart flag stays in the Bloom filter; the exact set has the final say.
+        """
+        self._ensure_loaded()
+        if expires is None:
+            expires = time.time() + LABEL_TTL_SECONDS
+        was_smart = self.ids.get(label.address) in self.smart_ids
+        self._add_exact(label.address, label.label, label.is_smart_money, expires)
+        if label.is_smart_money and not was_smart:
+            self.bloom.add_many([label.address])
+            if self.bloom.count > self.capacity:
+                self.capacity *= 2
+                self._resize([self.addresses[i] for i in self.smart_ids])
+
+    def flush(self):
+        self.bloom.flush()
+
+    # --- Lookups ---
+    def __contains__(self, address: str) -> bool:
+        self._ensure_loaded()
+        return self.ids.get(address) in self.smart_ids
+
+    def __len__(self) -> int:
+        # Before loading, the filter's insert count stands in (it may include demoted wallets)
+        return len(self.smart_ids) if self._loaded else self.bloom.count
+
+    def __iter__(self):
+        self._ensure_loaded()
+        return (self.addresses[i] for i in self.smart_ids)
+
+    def get_label(self, address: str) -> Optional[WalletLabel]:
+        """
+        The indexed label, or None if it is unknown or past its TTL (so callers re-fetch it).
+        """
+        self._ensure_loaded()
+        wallet_id = self.ids.get(address)
+        if wallet_id is None or self.expires[wallet_id] <= time.time():
+            return None
+        return WalletLabel(address=address, label=self.labels[wallet_id], is_smart_money=wallet_id in self.smart_ids)
+
+    def unseen(self, addresses: Sequence[str]) -> List[str]:
+        """
+        Addresses with no known or an expired label, i.e. the only ones worth sending to Nansen.
+        Until a label is refreshed its last smart flag still counts for membership.
+        """
+        self._ensure_loaded()
+        now = time.time()
+        unseen = []
+        for addr in dict.fromkeys(addresses):
+            wallet_id = self.ids.get(addr)
+            if wallet_id is None or self.expires[wallet_id] <= now:
+                unseen.append(addr)
+        return unseen
+
+    def contains_many(self, addresses) -> np.ndarray:
+        """
+        Exact smart-wallet membership mask for a column of addresses.
+        Until the exact set is loaded the Bloom filter answers in bulk, and the set is
+        only loaded once a row actually hits. After that a plain set lookup is faster
+        than hashing every row, so the filter is skipped.
+        """
+        addresses = np.asarray(addresses, dtype=object)
+        if not self._loaded:
+            mask = self.bloom.contains_many(addresses.astype(f"S{_ADDR_WIDTH}"))
+            hits = np.flatnonzero(mask)
+            if not len(hits):
+                return mask
+            self._ensure_loaded()
+            for i in hits:
+                mask[i] = self.ids.get(addresses[i]) in self.smart_ids
+            return mask
+        ids, smart = self.ids, self.smart_ids
+        return np.fromiter((ids.get(a) in smart for a in addresses), dtype=bool, count=len(addresses))
@@ -0,0 +1,49 @@
+import argparse
+from engine.discovery import TokenDiscovery, RecordedFlowSource
+from config import Config
+
+def main():
+    """
+    Replays token discovery over recorded net-inflow snapshots (Store) or a fake-flow JSON
+    file, printing the watchlist and scan schedule so ranking/budget settings can be tuned offline.
+    """
+    parser = argparse.ArgumentParser(description="Replay token discovery over recorded or fake flow data")
+    parser.add_argument("--flows", help='JSON file {"chain": {"token": [[ts, net_inflow], ...]}} (default: Store)')
+    parser.add_argument("--size", type=int, default=Config.WATCHLIST_SIZE, help="Watchlist size K")
+    parser.add_argument("--margin", type=float, default=Config.WATCHLIST_HYSTERESIS)
+    parser.add_argument("--budget", type=int, default=Config.SCAN_BUDGET, help="Transfer fetches per cycle")
+    parser.add_argument("--interval", type=float, default=Config.DISCOVERY_INTERVAL_SECONDS)
+    parser.add_argument("--step-seconds", type=float, default=60.0, help="Cycle length")
+    args = parser.parse_args()
+
+    source = RecordedFlowSource.from_file(args.flows) if args.flows else RecordedFlowSource.from_store()
+    start, end = source.time_range()
+    if end <= start and not any(source.snapshots.values()):
+        print("No flow data to replay.")
+        return
+
+    discovery = TokenDiscovery(source, watchlist_size=args.size, margin=args.margin,
+                               scan_budget=args.budget, interval_seconds=args.interval)
+    scans, churn, refreshes = {}, 0, 0
+    now = start
+    while now <= end:
+        before = set(discovery.watchlist)
+        refreshed = discovery.refresh(now)
+        if refreshed:
+            refreshes += 1
+            churn += len(before ^ set(discovery.watchlist))
+        for key in discovery.next_tick(now):
+            scans[key] = scans.get(key, 0) + 1
+        now += args.step_seconds
+
+    cycles = int((end - start) // args.step_seconds) + 1
+    print(f"{cycles} cycles, {refreshes} refreshes, {churn} watchlist changes, "
+          f"{sum(scans.values())} scans (budget {args.budget * cycles})")
+    print(f"{'Rank':<5} {'Chain':<10} {'Token':<46} {'Net inflow':>14} {'Scans/cycle':>12} {'Scanned':>8}")
+    for rank, key in enumerate(discovery.ranked(), 1):
+        chain, token = key
+        print(f"{rank:<5} {chain:<10} {token:<46} {discovery.watchlist[key]:>14.2f} "
+              f"{discovery.shares.get(key, 0):>12.2f} {scans.get(key, 0):>8}")
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ module.exports = {
             interpreter: "/home/ubuntu/solana-nansen-bot/venv/bin/python",
             cwd: "./",
             watch: true,
-            ignore_watch: ["*.db", "*.db-journal", "data/store.py"], // Ignore DB changes to prevent restart loops
+            ignore_watch: ["*.db", "*.db-journal", "*.bloom", "profiles", "checkpoints", "data/store.py"], // Ignore DB changes to prevent restart loops
             env: {
                 PYTHONUNBUFFERED: "1",
                 ...process.env
@@ -0,0 +1,225 @@
+import os
+import io
+import json
+import time
+import zlib
+import struct
+import threading
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+import numpy as np
+from config import Config
+
+# Journal record: seq, payload length, crc32 of payload, then the JSON payload
+_RECORD = struct.Struct("<QII")
+_DT_KEY = "__dt__"
+_ARRAY_KEY = "__array__"
+
+
+def _encode(obj, arrays: Dict[str, np.ndarray], path: str = "s"):
+    """
+    Turns a state tree into JSON-safe data. NumPy arrays are pulled out into `arrays`
+    (stored natively in the checkpoint), datetimes become tagged ISO strings.
+    """
+    if isinstance(obj, np.ndarray):
+        arrays[path] = obj
+        return {_ARRAY_KEY: path}
+    if isinstance(obj, datetime):
+        return {_DT_KEY: obj.isoformat()}
+    if isinstance(obj, dict):
+        return {k: _encode(v, arrays, f"{path}.{k}") for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_encode(v, arrays, f"{path}.{i}") for i, v in enumerate(obj)]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _decode(obj, arrays=None):
+    if isinstance(obj, dict):
+        if _DT_KEY in obj and len(obj) == 1:
+            return datetime.fromisoformat(obj[_DT_KEY])
+        if _ARRAY_KEY in obj and len(obj) == 1:
+            return arrays[obj[_ARRAY_KEY]]
+        return {k: _decode(v, arrays) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_decode(v, arrays) for v in obj]
+    return obj
+
+
+class TradeJournal:
+    """
+    Append-only write-ahead log of trades. Each record is fsynced before the trade
+    is applied in memory, so a crash can never lose a trade the Store has seen.
+    A torn or corrupt tail record (crash mid-write) is truncated away on open.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.last_seq = 0
+        # Appends (any trader, any thread) and compaction must not interleave
+        self._lock = threading.Lock()
+        self.valid_bytes = 0 # End of the last intact record
+        for seq, _ in self.read():
+            self.last_seq = seq
+        # Cut off a torn tail, otherwise later appends would land behind unreadable bytes
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.valid_bytes:
+            print(f"Truncating torn journal tail ({os.path.getsize(self.path) - self.valid_bytes} bytes)")
+            with open(self.path, "r+b") as f:
+                f.truncate(self.valid_bytes)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read(self, after_seq: int = 0) -> Iterator[Tuple[int, Dict]]:
+        self.valid_bytes = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                header = f.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                seq, length, crc = _RECORD.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                self.valid_bytes = f.tell()
+                if seq > after_seq:
+                    yield seq, _decode(json.loads(payload))
+
+    def append(self, entry: Dict) -> int:
+        payload = json.dumps(_encode(entry, {})).encode()
+        with self._lock:
+            self.last_seq += 1
+            with open(self.path, "ab") as f:
+                f.write(_RECORD.pack(self.last_seq, len(payload), zlib.crc32(payload)) + payload)
+                f.flush()
+                os.fsync(f.fileno())
+            return self.last_seq
+
+    def compact(self, upto_seq: int):
+        """
+        Drops records already covered by a checkpoint.
+        """
+        with self._lock:
+            keep = [(seq, entry) for seq, entry in self.read(after_seq=upto_seq)]
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                for seq, entry in keep:
+                    payload = json.dumps(_encode(entry, {})).encode()
+                    f.write(_RECORD.pack(seq, len(payload), zlib.crc32(payload)) + payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+
+
+class _BoundJournal:
+    """
+    Journal handle for one component; tags entries so replay can route them back.
+    """
+    def __init__(self, journal: TradeJournal, target: str):
+        self.journal = journal
+        self.target = target
+
+    def append(self, entry: Dict) -> int:
+        return self.journal.append({**entry, "target": self.target})
+
+
+class CheckpointManager:
+    """
+    Periodic binary checkpoints of bot state plus a trade journal for warm restarts.
+
+    Components are any objects with get_state()/load_state(); journaled ones also
+    expose apply(entry), or replay(entry) to redo side effects such as Store writes. On startup, restore() loads the latest checkpoint and replays
+    only the journal records written after it - no API refetching needed.
+    The label cache and wallet index already live on disk, so they are not duplicated here.
+    """
+    def __init__(self, directory: str = Config.CHECKPOINT_DIR,
+                 interval_seconds: float = Config.CHECKPOINT_INTERVAL_SECONDS):
+        os.makedirs(directory, exist_ok=True)
+        self.checkpoint_path = os.path.join(directory, "state.ckpt")
+        self.interval = interval_seconds
+        self.journal = TradeJournal(os.path.join(directory, "trades.journal"))
+        self._last_save = time.time()
+
+        # Sequence numbers must keep increasing even if the journal was compacted to empty
+        meta = self._read_meta()
+        if meta:
+            self.journal.last_seq = max(self.journal.last_seq, meta["seq"])
+
+    def journal_for(self, target: str) -> _BoundJournal:
+        return _BoundJournal(self.journal, target)
+
+    def _read_meta(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with np.load(self.checkpoint_path, allow_pickle=False) as data:
+                return json.loads(data["__meta__"].tobytes())
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable checkpoint: {e}")
+            return None
+
+    def save(self, components: Dict):
+        start = time.perf_counter()
+        arrays: Dict[str, np.ndarray] = {}
+        # Hold every trader's lock so a stream-thread trade can't land between reading seq and the states
+        with ExitStack() as stack:
+            for c in components.values():
+                if hasattr(c, "lock"):
+                    stack.enter_context(c.lock)
+            seq = self.journal.last_seq
+            state = {name: _encode(c.get_state(), arrays, name) for name, c in components.items()}
+
+        # savez keys must be identifiers, so map array paths to a0..aN
+        names = {path: f"a{i}" for i, path in enumerate(arrays)}
+        meta = json.dumps({"seq": seq, "time": datetime.utcnow().isoformat(), "state": state, "arrays": names}).encode()
+        buf = io.BytesIO()
+        np.savez(buf, __meta__=np.frombuffer(meta, dtype=np.uint8),
+                 **{names[path]: arr for path, arr in arrays.items()})
+
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.getvalue())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
+        self.journal.compact(seq)
+        self._last_save = time.time()
+        print(f"Checkpoint saved (seq {seq}, {len(buf.getvalue())} bytes) in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    def maybe_save(self, components: Dict):
+        if self.interval > 0 and time.time() - self._last_save >= self.interval:
+            self.save(components)
+
+    def restore(self, components: Dict) -> bool:
+        """
+        Loads the latest checkpoint into the components and replays the journal tail.
+        Returns False if there was nothing to restore.
+        """
+        start = time.perf_counter()
+        seq = 0
+        restored = False
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with np.load(self.checkpoint_path, allow_pickle=False) as data:
+                    meta = json.loads(data["__meta__"].tobytes())
+                    arrays = {path: data[key] for path, key in meta["arrays"].items()}
+                seq = meta["seq"]
+                for name, c in components.items():
+                    if name in meta["state"]:
+                        c.load_state(_decode(meta["state"][name], arrays))
+                restored = True
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable checkpoint: {e}")
+
+        replayed = 0
+        for _, entry in self.journal.read(after_seq=seq):
+            target = components.get(entry.pop("target", "trader"))
+            if target is not None:
+                getattr(target, "replay", target.apply)(entry)
+                replayed += 1
+
+        if restored or replayed:
+            print(f"Restored state from checkpoint seq {seq} + {replayed} journal entries in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return restored or replayed > 0
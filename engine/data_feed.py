@@ -0,0 +1,105 @@
+from typing import Dict, List, Optional, Tuple
+from data.nansen_client import NansenClient
+from data.transfer_decoder import TransferBatch
+from analysis.hold_time_index import HoldTimeIndex
+from config import Config
+
+class DataFeed:
+    """
+    Fetches each token's smart-money transfers at most once per tick and hands the
+    same read-only TransferBatch to every strategy that asks for it, so N strategy
+    variants cost one set of API calls.
+    """
+    _COLUMNS = ("tx_hash", "from_address", "to_address", "amount", "timestamps", "block_number")
+
+    def __init__(self, nansen: Optional[NansenClient] = None, lookback_hours: int = 24,
+                 record: bool = Config.RECORD_MARKET_DATA, hold_times: Optional[HoldTimeIndex] = None,
+                 discovery=None, label_budget: int = Config.LABEL_BUDGET):
+        self.nansen = nansen or NansenClient(api_key=Config.NANSEN_API_KEY)
+        self.lookback_hours = lookback_hours
+        self.record = record # Keep fetched transfers in the Store for sweeps / backtests
+        # Per-token smart-money hold times, fed once per fetch (not once per strategy)
+        self.hold_times = hold_times if hold_times is not None else HoldTimeIndex() # Empty index is falsy
+        # Unseen wallets are labelled before ingesting, at most label_budget API lookups per tick
+        self.label_budget = label_budget
+        self.labels_left = label_budget
+        # Optional TokenDiscovery (engine.discovery): decides which tokens get scanned each tick
+        self.discovery = discovery
+        self.tick = 0
+        self._transfers: Dict[Tuple[str, str], TransferBatch] = {} # (chain, token) -> batch
+        self.fetches = 0 # API fetches this tick
+        self.hits = 0 # Requests served from the shared batch this tick
+
+    def new_tick(self):
+        self.tick += 1
+        self._transfers.clear()
+        self.fetches = 0
+        self.hits = 0
+        self.labels_left = self.label_budget
+        if self.discovery is not None:
+            self.discovery.next_tick()
+
+    def scan_list(self, default: List[str], chain: str = "solana") -> List[Tuple[str, str]]:
+        """
+        (chain, token) pairs to scan this tick: the discovery schedule if there is one,
+        otherwise the `default` tokens on `chain`. An empty watchlist (no candidate with
+        positive inflow, or no flow data at all) also falls back to `default`.
+        """
+        if self.discovery is not None and self.discovery.watchlist:
+            return list(self.discovery.due)
+        return [(chain, token) for token in default]
+
+    def get_transfers(self, token_address: str, chain: str = "solana") -> TransferBatch:
+        batch = self._transfers.get((chain, token_address))
+        if batch is not None:
+            self.hits += 1
+            return batch
+
+        batch = self.nansen.get_smart_money_transfers(token_address, self.lookback_hours, chain=chain)
+        # Shared between strategies: make accidental in-place edits fail loudly
+        for name in self._COLUMNS:
+            getattr(batch, name).flags.writeable = False
+        self._transfers[(chain, token_address)] = batch
+        self.fetches += 1
+        # Hold times only count labelled smart wallets, so label the new counterparties first
+        self.labels_left -= self.nansen.label_transfers(batch, self.labels_left)
+        self.hold_times.ingest(batch, self.nansen.wallet_index)
+        if self.record:
+            from data.store import Store
+            Store().add_transfers(batch)
+        return batch
+
+
+class StrategyRunner:
+    """
+    Runs several Strategy instances off one DataFeed. Each strategy keeps its own
+    PaperTrader book and tags its Store rows with its strategy_id.
+    """
+    def __init__(self, feed: DataFeed, strategies: List):
+        self.feed = feed
+        self.strategies = strategies
+
+    def run_cycle(self):
+        self.feed.new_tick()
+        for strategy in self.strategies:
+            try:
+                strategy.run_cycle()
+            except Exception as e:
+                # One broken variant shouldn't stop the others
+                print(f"Strategy {strategy.strategy_id} failed: {e}")
+        if len(self.strategies) > 1:
+            print(f"Feed tick {self.feed.tick}: {self.feed.fetches} fetches shared by {len(self.strategies)} strategies "
+                  f"({self.feed.hits} reused)")
+
+    def components(self) -> Dict:
+        """
+        Checkpoint components; the default trader keeps the plain name for compatibility.
+        Strategies hold no runtime state (their token list is configuration), so they aren't checkpointed.
+        """
+        comps = {}
+        for strategy in self.strategies:
+            suffix = "" if strategy.strategy_id == "default" else f":{strategy.strategy_id}"
+            comps[f"trader{suffix}"] = strategy.trader
+        if self.feed.discovery is not None:
+            comps["discovery"] = self.feed.discovery
+        return comps
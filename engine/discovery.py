@@ -0,0 +1,234 @@
+import json
+import time
+from abc import ABC, abstractmethod
+import heapq
+import bisect
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+
+def net_flow(row: Dict) -> float:
+    """
+    Net smart-money inflow of one flow row: `net_flow` if present, else inflow - outflow.
+    """
+    if row.get("net_flow") is not None:
+        return float(row["net_flow"])
+    return float(row.get("inflow", 0) or 0) - float(row.get("outflow", 0) or 0)
+
+
+class FlowSource(ABC):
+    """
+    Where discovery gets smart-money net inflows from. net_inflows() returns
+    {token: net inflow} for the given candidates as of `now` (epoch seconds).
+    """
+    def candidates(self) -> Dict[str, List[str]]:
+        return {}
+
+    @abstractmethod
+    def net_inflows(self, chain: str, tokens: List[str], now: float) -> Dict[str, float]:
+        ...
+
+
+class NansenFlowSource(FlowSource):
+    """
+    Live flows from NansenClient.get_token_flows; one call per candidate per refresh.
+    Candidates come from Config.DISCOVERY_CANDIDATES ({"chain": ["token", ...]}).
+    """
+    def __init__(self, nansen, candidates: Optional[Dict[str, List[str]]] = None,
+                 lookback_hours: int = Config.DISCOVERY_LOOKBACK_HOURS):
+        self.nansen = nansen
+        self._candidates = candidates if candidates is not None else json.loads(Config.DISCOVERY_CANDIDATES or "{}")
+        self.lookback_hours = lookback_hours
+
+    def candidates(self) -> Dict[str, List[str]]:
+        return self._candidates
+
+    def net_inflows(self, chain: str, tokens: List[str], now: float) -> Dict[str, float]:
+        start_date = (datetime.utcfromtimestamp(now) - timedelta(hours=self.lookback_hours)).strftime("%Y-%m-%d")
+        return {token: sum(net_flow(row) for row in self.nansen.get_token_flows(token, start_date, chain=chain))
+                for token in tokens}
+
+
+class RecordedFlowSource(FlowSource):
+    """
+    Replays net-inflow snapshots: a token's value at `now` is its latest snapshot at or
+    before it. Built from the Store (flows recorded by live discovery) or a JSON file of
+    fake data: {"chain": {"token": [[timestamp, net_inflow], ...]}}.
+    """
+    def __init__(self, snapshots: Dict[str, Dict[str, List[Tuple[float, float]]]]):
+        self.snapshots = {}
+        for chain, tokens in snapshots.items():
+            self.snapshots[chain] = {}
+            for token, rows in tokens.items():
+                rows = sorted((float(ts), float(value)) for ts, value in rows)
+                self.snapshots[chain][token] = ([r[0] for r in rows], [r[1] for r in rows])
+
+    @classmethod
+    def from_store(cls, start: Optional[float] = None, end: Optional[float] = None) -> "RecordedFlowSource":
+        from data.store import Store
+        return cls(Store().get_token_flows(start, end))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecordedFlowSource":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def candidates(self) -> Dict[str, List[str]]:
+        return {chain: list(tokens) for chain, tokens in self.snapshots.items()}
+
+    def time_range(self) -> Tuple[float, float]:
+        times = [ts for tokens in self.snapshots.values() for ts_list, _ in tokens.values() for ts in ts_list]
+        return (min(times), max(times)) if times else (0.0, 0.0)
+
+    def net_inflows(self, chain: str, tokens: List[str], now: float) -> Dict[str, float]:
+        flows = {}
+        chain_rows = self.snapshots.get(chain, {})
+        for token in tokens:
+            rows = chain_rows.get(token)
+            if rows is None:
+                continue
+            i = bisect.bisect_right(rows[0], now) - 1
+            if i >= 0:
+                flows[token] = rows[1][i]
+        return flows
+
+
+class TokenDiscovery:
+    """
+    Ranks candidate tokens on every chain by smart-money net inflow and keeps a bounded
+    top-K watchlist. Hysteresis stops churn: a newcomer must beat the weakest member by
+    `margin`, and members only leave once they fall out of the top K * (1 + margin) or
+    their inflow turns non-positive. Each tick, `scan_budget` transfer fetches are split
+    across chains (by their watchlisted inflow) and tokens (by rank) via scan credits.
+    """
+    def __init__(self, source: FlowSource, watchlist_size: int = Config.WATCHLIST_SIZE,
+                 margin: float = Config.WATCHLIST_HYSTERESIS, scan_budget: int = Config.SCAN_BUDGET,
+                 interval_seconds: float = Config.DISCOVERY_INTERVAL_SECONDS, record: bool = False):
+        self.source = source
+        self.watchlist_size = watchlist_size
+        self.margin = margin
+        self.scan_budget = scan_budget
+        self.interval_seconds = interval_seconds
+        self.record = record # Keep net-inflow snapshots in the Store for replays
+        # Keys are (chain, token): the same address can exist on several EVM chains
+        self.watchlist: Dict[Tuple[str, str], float] = {} # -> net inflow
+        self.shares: Dict[Tuple[str, str], float] = {} # -> expected scans per tick
+        self.credits: Dict[Tuple[str, str], float] = {}
+        self.due: List[Tuple[str, str]] = []
+        self.last_refresh = 0.0
+
+    def ranked(self) -> List[Tuple[str, str]]:
+        return sorted(self.watchlist, key=lambda key: -self.watchlist[key])
+
+    # --- Ranking ---
+    def refresh(self, now: Optional[float] = None) -> bool:
+        """
+        Re-ranks the candidates if the refresh interval has passed. Returns True if it ran.
+        """
+        now = time.time() if now is None else now
+        if self.last_refresh and now - self.last_refresh < self.interval_seconds:
+            return False
+        self.last_refresh = now
+
+        scored = []
+        for chain, tokens in self.source.candidates().items():
+            flows = self.source.net_inflows(chain, tokens, now)
+            scored += [(flow, (chain, token)) for token, flow in flows.items()]
+            if self.record and flows:
+                from data.store import Store
+                Store().add_token_flows(chain, now, flows)
+
+        k = self.watchlist_size
+        exit_rank = k + max(1, int(k * self.margin))
+        top = [s for s in heapq.nlargest(exit_rank, scored) if s[0] > 0]
+
+        # Members hold their place anywhere inside the exit band
+        kept = [(flow, key) for flow, key in top if key in self.watchlist]
+        heap = sorted(kept)[-k:] # Min-heap on inflow, weakest member at heap[0]
+        heapq.heapify(heap)
+        # Newcomers from the top K have to displace the weakest member by the margin
+        for flow, key in top[:k]:
+            if key in self.watchlist:
+                continue
+            if len(heap) < k:
+                heapq.heappush(heap, (flow, key))
+            elif flow > heap[0][0] * (1 + self.margin):
+                heapq.heapreplace(heap, (flow, key))
+
+        old = set(self.watchlist)
+        self.watchlist = {key: flow for flow, key in heap}
+        added, dropped = set(self.watchlist) - old, old - set(self.watchlist)
+        for key in dropped:
+            self.credits.pop(key, None)
+        self._allocate()
+        if added or dropped:
+            print(f"Watchlist: +{len(added)} -{len(dropped)} ({len(self.watchlist)} tokens across "
+                  f"{len({chain for chain, _ in self.watchlist})} chains)")
+        if not self.watchlist:
+            print("Watchlist empty (no candidate with positive smart-money inflow), scanning the fixed token list")
+        return True
+
+    def _allocate(self):
+        """
+        Splits the per-tick scan budget: chains by total inflow, tokens within a chain by
+        1/rank, nobody above one scan per tick (the excess is handed to the rest).
+        """
+        by_chain: Dict[str, List[Tuple[str, str]]] = {}
+        for key in self.ranked():
+            by_chain.setdefault(key[0], []).append(key)
+        total = sum(self.watchlist.values())
+
+        weights = {}
+        for chain, keys in by_chain.items():
+            chain_share = sum(self.watchlist[key] for key in keys) / total
+            rank_weights = [1.0 / (rank + 1) for rank in range(len(keys))]
+            norm = sum(rank_weights)
+            for key, w in zip(keys, rank_weights):
+                weights[key] = chain_share * w / norm
+
+        shares, budget = {}, float(self.scan_budget)
+        while weights:
+            norm = sum(weights.values())
+            capped = {key for key, w in weights.items() if budget * w / norm >= 1.0}
+            if not capped:
+                shares.update({key: budget * w / norm for key, w in weights.items()})
+                break
+            for key in capped:
+                shares[key] = 1.0
+                del weights[key]
+            budget -= len(capped)
+            if budget <= 0:
+                shares.update({key: 0.0 for key in weights})
+                break
+        self.shares = shares
+
+    # --- Per-tick scheduling ---
+    def next_tick(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Refreshes if due, then picks at most scan_budget (chain, token) pairs to scan this tick.
+        """
+        self.refresh(now)
+        for key, share in self.shares.items():
+            self.credits[key] = min(self.credits.get(key, 0.0) + share, 2.0)
+        ready = [key for key, credit in self.credits.items() if credit >= 1.0]
+        ready.sort(key=lambda key: (-self.credits[key], -self.watchlist[key]))
+        self.due = ready[:self.scan_budget]
+        for key in self.due:
+            self.credits[key] -= 1.0
+        return self.due
+
+    def get_state(self) -> Dict:
+        return {
+            "watchlist": [[chain, token, flow] for (chain, token), flow in self.watchlist.items()],
+            "credits": [[chain, token, credit] for (chain, token), credit in self.credits.items()],
+            "last_refresh": self.last_refresh
+        }
+
+    def load_state(self, state: Dict):
+        self.watchlist = {(chain, token): flow for chain, token, flow in state["watchlist"]}
+        self.credits = {(chain, token): credit for chain, token, credit in state["credits"]
+                        if (chain, token) in self.watchlist}
+        self.last_refresh = state["last_refresh"]
+        if self.watchlist:
+            self._allocate()
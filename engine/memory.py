@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import resource
+from typing import Dict, List, Optional
+
+def current_rss_mb() -> float:
+    """
+    Current resident set size. Reads /proc on Linux, falls back to peak RSS elsewhere.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3 # bytes on macOS, KB on Linux
+
+
+class MemoryMonitor:
+    """
+    Reports RSS and the size of each capped in-process structure to the status table
+    (system_status key "memory"), so growth shows up before pm2 has to restart us.
+    """
+    def __init__(self, strategies: List, feed=None):
+        self.strategies = strategies
+        self.feed = feed
+        self.baseline_rss_mb: Optional[float] = None
+
+    def snapshot(self) -> Dict:
+        rss = current_rss_mb()
+        if self.baseline_rss_mb is None:
+            self.baseline_rss_mb = rss
+        report = {"rss_mb": round(rss, 1), "rss_growth_mb": round(rss - self.baseline_rss_mb, 1), "structures": {}}
+        structures = report["structures"]
+
+        for strategy in self.strategies:
+            trader = strategy.trader
+            book = trader.positions
+            structures[f"trade_history:{strategy.strategy_id}"] = {
+                "items": len(trader.trade_history), "cap": trader.trade_history.maxlen
+            }
+            structures[f"positions:{strategy.strategy_id}"] = {
+                "items": len(book), "slots": book.capacity,
+                "bytes": sum(getattr(book, name).nbytes for name in book._ARRAYS)
+            }
+
+        if self.feed is not None:
+            batches = list(self.feed._transfers.values())
+            structures["feed_batches"] = {
+                "items": sum(len(b) for b in batches),
+                "bytes": sum(getattr(b, name).nbytes for b in batches for name in self.feed._COLUMNS)
+            }
+            structures["hold_times"] = {"tokens": len(self.feed.hold_times)}
+            index = self.feed.nansen._wallet_index
+            if index is not None:
+                structures["wallet_index"] = {"labelled": len(index.ids), "smart": len(index),
+                                              "bloom_bytes": index.bloom.bits.nbytes}
+        return report
+
+    def report(self) -> Dict:
+        report = self.snapshot()
+        from data.store import Store
+        Store().set_status("memory", json.dumps(report))
+        return report
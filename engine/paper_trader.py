@@ -1,98 +1,190 @@
-from typing import Dict
-from dataclasses import dataclass
+import uuid
+import threading
+from collections import deque
+from typing import Dict, List, Optional
 from datetime import datetime
+from engine.position_book import PositionBook, EXIT_TIME
+from config import Config
 
-@dataclass
-class Position:
-    token_address: str
-    amount: float
-    entry_price: float
-    entry_time: datetime
-    target_exit_time: datetime
+def _trade_from_row(row: Dict) -> Dict:
+    """
+    Turns a Store trades row back into the trade dict buy()/sell() produce.
+    """
+    trade = {
+        "id": row.get("trade_id"),
+        "type": row["type"],
+        "token": row["token_address"],
+        "amount_sol": row["amount"],
+        "price": row["price"],
+        "time": datetime.fromisoformat(row["timestamp"].rstrip("Z")) if row.get("timestamp") else None,
+        "reasoning": row.get("reasoning") or "",
+        "strategy": row.get("strategy_id") or "default"
+    }
+    if row["type"] == "SELL":
+        trade["pnl"] = row.get("pnl") or 0.0
+        trade["pnl_percent"] = row.get("pnl_percent") or 0.0
+    return trade
 
 class PaperTrader:
-    def __init__(self, initial_balance: float = 10.0):
+    def __init__(self, initial_balance: float = 10.0, stop_loss: float = Config.DEFAULT_STOP_LOSS,
+                 take_profit: float = Config.DEFAULT_TAKE_PROFIT, journal=None, log_initial: bool = True,
+                 strategy_id: str = "default", history_limit: int = Config.TRADE_HISTORY_LIMIT):
         self.balance_sol = initial_balance
-        self.positions: Dict[str, Position] = {}
-        self.trade_history = []
-        
-        # Initial Log
+        self.strategy_id = strategy_id # Tags this book's rows in the Store
+        self.stop_loss = stop_loss # Fraction below entry, e.g. 0.10 = -10%
+        self.take_profit = take_profit # Fraction above entry, 0 disables
+        self.positions = PositionBook()
+        # Ring of recent trades; everything is in the Store (see get_trade_history)
+        self.trade_history = deque(maxlen=history_limit or None)
+        # Guards buys/sells: the price watcher can sell from its stream thread mid-cycle
+        self.lock = threading.RLock()
+        # Optional write-ahead TradeJournal (engine.checkpoint): trades are journaled before being applied
+        self.journal = journal
+
+        # Initial Log (skipped when state is about to be restored from a checkpoint)
+        if log_initial:
+            from data.store import Store
+            store = Store()
+            store.log_portfolio(self.balance_sol, self.positions, strategy_id=self.strategy_id)
+
+    def get_trade_history(self, limit: int = 50) -> List[Dict]:
+        """
+        Newest-first trades. Served from the in-memory ring when it holds enough,
+        otherwise from the Store (converted back to the same trade dicts).
+        """
+        if limit <= len(self.trade_history):
+            return list(self.trade_history)[::-1][:limit]
         from data.store import Store
-        store = Store()
-        store.log_portfolio(self.balance_sol, self.positions)
-        
+        return [_trade_from_row(row) for row in Store().get_trades(limit=limit, strategy_id=self.strategy_id)]
+
     def get_portfolio_value(self) -> float:
         # In a real system, we'd need current prices of all held tokens
         # For simplicity, returning SOL balance
         return self.balance_sol
 
-    def buy(self, token_address: str, amount_sol: float, price_per_token: float, target_exit_time: datetime):
-        if amount_sol > self.balance_sol:
-            print(f"FAILED BUY: Insufficient funds. Balance: {self.balance_sol}, Required: {amount_sol}")
-            return
-            
-        token_amount = amount_sol / price_per_token
-        self.balance_sol -= amount_sol
-        
-        position = Position(
-            token_address=token_address,
-            amount=token_amount,
-            entry_price=price_per_token,
-            entry_time=datetime.now(),
-            target_exit_time=target_exit_time
-        )
-        self.positions[token_address] = position
-        
-            "type": "BUY",
-            "token": token_address,
-            "amount_sol": amount_sol,
-            "price": price_per_token,
-            "time": datetime.utcnow(),
-            "reasoning": "Buy Wave Detected" # Placeholder, can be passed in
-        }
-        self.trade_history.append(trade_data)
-        
-        # Persistent Log
-        from data.store import Store
-        store = Store()
-        store.add_trade(trade_data)
-        
-        # Log Portfolio State
-        store.log_portfolio(self.balance_sol, self.positions)
-        
-        print(f"PAPER TRADE: BOUGHT {token_amount:.4f} of {token_address} @ {price_per_token} SOL")
-
-    def sell(self, token_address: str, price_per_token: float):
-        if token_address not in self.positions:
-            return
-            
-        pos = self.positions[token_address]
-        sol_value = pos.amount * price_per_token
-        self.balance_sol += sol_value
-        
-        # Calculate PnL
-        pnl = sol_value - (pos.amount * pos.entry_price)
-        pnl_percent = (pnl / (pos.amount * pos.entry_price)) * 100
-        
-        trade_data = {
-            "type": "SELL",
-            "token": token_address,
-            "amount_sol": sol_value,
-            "price": price_per_token,
-            "pnl": pnl,
-            "pnl_percent": pnl_percent,
-            "time": datetime.utcnow(),
-            "reasoning": "Target Exit Time Reached" # Default
-        }
-        self.trade_history.append(trade_data)
-        
-        # Persistent Log
+    def buy(self, token_address: str, amount_sol: float, price_per_token: float, target_exit_time: datetime,
+            stop_loss: Optional[float] = None, take_profit: Optional[float] = None):
+        with self.lock:
+            if amount_sol > self.balance_sol:
+                print(f"FAILED BUY: Insufficient funds. Balance: {self.balance_sol}, Required: {amount_sol}")
+                return
+
+            token_amount = amount_sol / price_per_token
+
+            stop_loss = self.stop_loss if stop_loss is None else stop_loss
+            take_profit = self.take_profit if take_profit is None else take_profit
+
+            trade_data = {
+                "id": uuid.uuid4().hex,
+                "type": "BUY",
+                "token": token_address,
+                "amount_sol": amount_sol,
+                "price": price_per_token,
+                "time": datetime.utcnow(),
+                "reasoning": "Buy Wave Detected", # Placeholder, can be passed in
+                "strategy": self.strategy_id
+            }
+            position = {
+                "amount": token_amount,
+                "entry_price": price_per_token,
+                "entry_ts": datetime.now().timestamp(),
+                "target_exit_ts": target_exit_time.timestamp(),
+                "stop_price": price_per_token * (1 - stop_loss) if stop_loss > 0 else 0.0,
+                "take_profit_price": price_per_token * (1 + take_profit) if take_profit > 0 else float("inf")
+            }
+            self._record({"op": "BUY", "trade": trade_data, "position": position})
+
+            # Persistent Log
+            from data.store import Store
+            store = Store()
+            store.add_trade(trade_data)
+
+            # Log Portfolio State
+            store.log_portfolio(self.balance_sol, self.positions, strategy_id=self.strategy_id)
+
+            print(f"PAPER TRADE: BOUGHT {token_amount:.4f} of {token_address} @ {price_per_token} SOL")
+
+    def sell(self, token_address: str, price_per_token: float, reasoning: str = EXIT_TIME):
+        with self.lock:
+            if token_address not in self.positions:
+                return
+
+            pos = self.positions[token_address]
+            sol_value = pos.amount * price_per_token
+
+            # Calculate PnL
+            pnl = sol_value - (pos.amount * pos.entry_price)
+            pnl_percent = (pnl / (pos.amount * pos.entry_price)) * 100
+
+            trade_data = {
+                "id": uuid.uuid4().hex,
+                "type": "SELL",
+                "token": token_address,
+                "amount_sol": sol_value,
+                "price": price_per_token,
+                "pnl": pnl,
+                "pnl_percent": pnl_percent,
+                "time": datetime.utcnow(),
+                "reasoning": reasoning,
+                "strategy": self.strategy_id
+            }
+            self._record({"op": "SELL", "trade": trade_data})
+
+            # Persistent Log
+            from data.store import Store
+            store = Store()
+            store.add_trade(trade_data)
+
+            # Log Portfolio State
+            store.log_portfolio(self.balance_sol, self.positions, strategy_id=self.strategy_id)
+
+            print(f"PAPER TRADE: SOLD {pos.amount:.4f} of {token_address} @ {price_per_token} SOL. PnL: {pnl_percent:.2f}%")
+
+    # --- State changes (shared by live trading and journal replay) ---
+    def _record(self, entry: Dict):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.append(entry)
+            self.apply(entry)
+
+    def apply(self, entry: Dict):
+        """
+        Applies a BUY/SELL journal entry to in-memory state. No Store writes, no journaling.
+        """
+        trade = entry["trade"]
+        if entry["op"] == "BUY":
+            pos = entry["position"]
+            self.balance_sol -= trade["amount_sol"]
+            self.positions.add_raw(
+                trade["token"], pos["amount"], pos["entry_price"], pos["entry_ts"],
+                pos["target_exit_ts"], pos["stop_price"], pos["take_profit_price"]
+            )
+        elif entry["op"] == "SELL":
+            # Only credit proceeds for a position that was actually open (guards double sells and replays)
+            if self.positions.remove(trade["token"]) is None:
+                return
+            self.balance_sol += trade["amount_sol"]
+        self.trade_history.append(trade)
+
+    def replay(self, entry: Dict):
+        """
+        Journal replay after a restart: applies the entry and re-issues its Store write,
+        which is skipped if the trade row already made it to the Store before the crash.
+        """
+        self.apply(entry)
         from data.store import Store
-        store = Store()
-        store.add_trade(trade_data)
-        
-        # Log Portfolio State
-        store.log_portfolio(self.balance_sol, self.positions)
-        
-        del self.positions[token_address]
-        print(f"PAPER TRADE: SOLD {pos.amount:.4f} of {token_address} @ {price_per_token} SOL. PnL: {pnl_percent:.2f}%")
+        if "id" in entry["trade"] and Store().add_trade(entry["trade"]):
+            print(f"Recovered unrecorded {entry['op']} of {entry['trade']['token']} from the journal")
+
+    def get_state(self) -> Dict:
+        with self.lock:
+            return {
+                "balance_sol": self.balance_sol,
+                "positions": self.positions.get_state(),
+                "trade_history": list(self.trade_history)
+            }
+
+    def load_state(self, state: Dict):
+        self.balance_sol = state["balance_sol"]
+        self.positions.load_state(state["positions"])
+        self.trade_history = deque(state["trade_history"], maxlen=self.trade_history.maxlen)
@@ -0,0 +1,204 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import numpy as np
+
+@dataclass
+class Position:
+    token_address: str
+    amount: float
+    entry_price: float
+    entry_time: datetime
+    target_exit_time: datetime
+    stop_price: float = 0.0
+    take_profit_price: float = float("inf")
+
+# Exit reasons, in priority order (a stop beats a take-profit beats a timer)
+EXIT_STOP_LOSS = "Stop Loss Hit"
+EXIT_TAKE_PROFIT = "Take Profit Hit"
+EXIT_TIME = "Target Exit Time Reached"
+
+class PositionBook:
+    """
+    Open positions stored as parallel NumPy arrays, one slot per position.
+    A token -> slot dict gives O(1) lookup and closed slots go on a free list
+    so they get reused before the arrays grow.
+
+    Times are stored as epoch seconds. Behaves like a read-only dict of
+    token -> Position for existing callers (`in`, `[]`, `items()`, `len()`).
+    """
+    _ARRAYS = ("entry_price", "amount", "entry_time", "target_exit", "stop_price", "take_profit", "active")
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        self.entry_price = np.zeros(capacity, dtype=np.float64)
+        self.amount = np.zeros(capacity, dtype=np.float64)
+        self.entry_time = np.zeros(capacity, dtype=np.float64)
+        self.target_exit = np.full(capacity, np.inf, dtype=np.float64)
+        self.stop_price = np.zeros(capacity, dtype=np.float64)
+        self.take_profit = np.full(capacity, np.inf, dtype=np.float64)
+        self.active = np.zeros(capacity, dtype=bool)
+
+        self.tokens: List[Optional[str]] = [None] * capacity
+        self.slots: Dict[str, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    @property
+    def capacity(self) -> int:
+        return len(self.active)
+
+    def _grow(self):
+        old = self.capacity
+        new = old * 2
+        for name in ("entry_price", "amount", "entry_time", "stop_price"):
+            arr = getattr(self, name)
+            grown = np.zeros(new, dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        for name in ("target_exit", "take_profit"):
+            arr = getattr(self, name)
+            grown = np.full(new, np.inf, dtype=arr.dtype)
+            grown[:old] = arr
+            setattr(self, name, grown)
+        active = np.zeros(new, dtype=bool)
+        active[:old] = self.active
+        self.active = active
+
+        self.tokens.extend([None] * (new - old))
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def add(self, token_address: str, amount: float, entry_price: float,
+            entry_time: datetime, target_exit_time: datetime,
+            stop_price: float = 0.0, take_profit_price: float = float("inf")) -> int:
+        """
+        Opens a position and returns its slot. Replaces any existing position in the same token.
+        """
+        return self.add_raw(token_address, amount, entry_price, entry_time.timestamp(),
+                            target_exit_time.timestamp(), stop_price, take_profit_price)
+
+    def add_raw(self, token_address: str, amount: float, entry_price: float, entry_ts: float,
+                target_exit_ts: float, stop_price: float = 0.0, take_profit_price: float = float("inf")) -> int:
+        """
+        Same as add() but with epoch-second times, so journal replay restores them bit-exact.
+        """
+        if token_address in self.slots:
+            self.remove(token_address)
+        if not self._free:
+            self._grow()
+
+        slot = self._free.pop()
+        self.entry_price[slot] = entry_price
+        self.amount[slot] = amount
+        self.entry_time[slot] = entry_ts
+        self.target_exit[slot] = target_exit_ts
+        self.stop_price[slot] = stop_price
+        self.take_profit[slot] = take_profit_price
+        self.active[slot] = True
+
+        self.tokens[slot] = token_address
+        self.slots[token_address] = slot
+        return slot
+
+    def remove(self, token_address: str) -> Optional[Position]:
+        slot = self.slots.pop(token_address, None)
+        if slot is None:
+            return None
+        pos = self._position_at(slot)
+
+        self.active[slot] = False
+        self.target_exit[slot] = np.inf
+        self.take_profit[slot] = np.inf
+        self.stop_price[slot] = 0.0
+        self.tokens[slot] = None
+        self._free.append(slot)
+        return pos
+
+    def set_target_exit(self, token_address: str, target_exit_time: datetime):
+        self.target_exit[self.slots[token_address]] = target_exit_time.timestamp()
+
+    def _position_at(self, slot: int) -> Position:
+        return Position(
+            token_address=self.tokens[slot],
+            amount=float(self.amount[slot]),
+            entry_price=float(self.entry_price[slot]),
+            entry_time=datetime.fromtimestamp(self.entry_time[slot]),
+            target_exit_time=datetime.fromtimestamp(self.target_exit[slot]),
+            stop_price=float(self.stop_price[slot]),
+            take_profit_price=float(self.take_profit[slot])
+        )
+
+    # --- Checkpointing ---
+    def get_state(self) -> Dict:
+        return {
+            "arrays": {name: getattr(self, name).copy() for name in self._ARRAYS},
+            "tokens": list(self.tokens),
+            "free": list(self._free)
+        }
+
+    def load_state(self, state: Dict):
+        for name in self._ARRAYS:
+            setattr(self, name, np.array(state["arrays"][name], dtype=getattr(self, name).dtype))
+        self.tokens = list(state["tokens"])
+        self._free = [int(slot) for slot in state["free"]]
+        self.slots = {token: slot for slot, token in enumerate(self.tokens) if token is not None}
+
+    # --- Dict-like access (returns snapshots; use set_target_exit to mutate) ---
+    def __contains__(self, token_address: str) -> bool:
+        return token_address in self.slots
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.slots))
+
+    def __getitem__(self, token_address: str) -> Position:
+        return self._position_at(self.slots[token_address])
+
+    def get(self, token_address: str) -> Optional[Position]:
+        slot = self.slots.get(token_address)
+        return self._position_at(slot) if slot is not None else None
+
+    def keys(self) -> List[str]:
+        return list(self.slots)
+
+    def items(self) -> List[Tuple[str, Position]]:
+        return [(token, self._position_at(slot)) for token, slot in self.slots.items()]
+
+    def values(self) -> List[Position]:
+        return [self._position_at(slot) for slot in self.slots.values()]
+
+    # --- Vectorized evaluation ---
+    def price_vector(self, prices: Dict[str, float]) -> np.ndarray:
+        """
+        Builds a slot-aligned price array from a token -> price dict. Missing prices are NaN.
+        """
+        vec = np.full(self.capacity, np.nan, dtype=np.float64)
+        for token, price in prices.items():
+            slot = self.slots.get(token)
+            if slot is not None:
+                vec[slot] = price
+        return vec
+
+    def evaluate(self, prices: np.ndarray, now: float) -> List[Tuple[str, str, int]]:
+        """
+        Checks every open position in one pass against a slot-aligned price vector
+        (NaN = no price) and an epoch-seconds `now`.
+        Returns (token, reason, slot) for each position that should be closed.
+        """
+        n = self.capacity
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(prices) < n:
+            prices = np.concatenate([prices, np.full(n - len(prices), np.nan)])
+        prices = prices[:n]
+
+        # NaN comparisons are False, so unpriced positions only ever hit the timer
+        stop_hit = self.active & (prices <= self.stop_price)
+        tp_hit = self.active & (prices >= self.take_profit) & ~stop_hit
+        time_hit = self.active & (self.target_exit <= now) & ~stop_hit & ~tp_hit
+
+        exits = []
+        for mask, reason in ((stop_hit, EXIT_STOP_LOSS), (tp_hit, EXIT_TAKE_PROFIT), (time_hit, EXIT_TIME)):
+            for slot in np.flatnonzero(mask):
+                exits.append((self.tokens[slot], reason, int(slot)))
+        return exits
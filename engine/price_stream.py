@@ -0,0 +1,231 @@
+import json
+import time
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from engine.position_book import EXIT_STOP_LOSS, EXIT_TAKE_PROFIT
+from config import Config
+
+PriceCallback = Callable[[str, float, Optional[float]], None]
+
+
+class PriceSource:
+    """
+    Pluggable push feed. start() begins delivering (token, price, ts) to the callback;
+    subscribe()/unsubscribe() change the token set while running.
+    """
+    def __init__(self):
+        self.tokens: Set[str] = set()
+        self.callback: Optional[PriceCallback] = None
+
+    def start(self, callback: PriceCallback):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def subscribe(self, tokens: Iterable[str]):
+        self.tokens.update(tokens)
+
+    def unsubscribe(self, tokens: Iterable[str]):
+        self.tokens.difference_update(tokens)
+
+
+class LocalPricePublisher(PriceSource):
+    """
+    In-process stand-in for a real feed (tests, replays). publish() pushes synchronously,
+    and only for subscribed tokens, like a server-side filtered stream.
+    """
+    def publish(self, token: str, price: float, ts: Optional[float] = None):
+        if self.callback is not None and token in self.tokens:
+            self.callback(token, price, ts)
+
+
+class WebSocketPriceSource(PriceSource):
+    """
+    Websocket price feed (needs the `websocket-client` package). Sends
+    {"op": "subscribe"|"unsubscribe", "tokens": [...]} and expects messages like
+    {"token": "...", "price": 0.01, "ts": 1700000000.0} (a list of them also works).
+    Reconnects with backoff and re-subscribes on every (re)connect.
+    """
+    def __init__(self, url: str, reconnect_seconds: float = 2.0):
+        super().__init__()
+        self.url = url
+        self.reconnect_seconds = reconnect_seconds
+        self._ws = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, callback: PriceCallback):
+        import websocket # websocket-client
+        super().start(callback)
+        self._running = True
+
+        def on_open(ws):
+            if self.tokens:
+                self._send("subscribe", self.tokens)
+
+        def on_message(ws, message):
+            try:
+                data = json.loads(message)
+            except ValueError:
+                return
+            for item in data if isinstance(data, list) else [data]:
+                try:
+                    token, price = item["token"], float(item["price"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                cb = self.callback
+                if cb is not None:
+                    cb(token, price, item.get("ts"))
+
+        def run():
+            while self._running:
+                self._ws = websocket.WebSocketApp(self.url, on_open=on_open, on_message=on_message)
+                self._ws.run_forever()
+                if self._running:
+                    print(f"Price stream disconnected, reconnecting in {self.reconnect_seconds}s...")
+                    time.sleep(self.reconnect_seconds)
+
+        self._thread = threading.Thread(target=run, name="price-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        super().stop()
+        if self._ws is not None:
+            self._ws.close()
+
+    def _send(self, op: str, tokens: Iterable[str]):
+        ws = self._ws
+        if ws is not None and ws.sock is not None and ws.sock.connected:
+            ws.send(json.dumps({"op": op, "tokens": sorted(tokens)}))
+
+    def subscribe(self, tokens: Iterable[str]):
+        new = set(tokens) - self.tokens
+        super().subscribe(new)
+        if new:
+            self._send("subscribe", new)
+
+    def unsubscribe(self, tokens: Iterable[str]):
+        gone = set(tokens) & self.tokens
+        super().unsubscribe(gone)
+        if gone:
+            self._send("unsubscribe", gone)
+
+
+class ThresholdIndex:
+    """
+    Per-token sorted stop and take-profit levels across all books, so a tick only
+    touches the positions whose level it actually crosses (bisect, not a scan).
+    """
+    def __init__(self):
+        # token -> (sorted levels, owners) for stops and for targets
+        self._stops: Dict[str, Tuple[List[float], List]] = {}
+        self._targets: Dict[str, Tuple[List[float], List]] = {}
+
+    def set_token(self, token: str, stops: List[Tuple[float, object]], targets: List[Tuple[float, object]]):
+        for table, entries in ((self._stops, stops), (self._targets, targets)):
+            if entries:
+                entries = sorted(entries, key=lambda e: e[0])
+                table[token] = ([e[0] for e in entries], [e[1] for e in entries])
+            else:
+                table.pop(token, None)
+
+    def tokens(self) -> Set[str]:
+        return set(self._stops) | set(self._targets)
+
+    def crossed(self, token: str, price: float) -> List[Tuple[object, str]]:
+        hits = []
+        stops = self._stops.get(token)
+        if stops:
+            # Stop hit when price <= level: every level >= price
+            i = bisect.bisect_left(stops[0], price)
+            hits += [(owner, EXIT_STOP_LOSS) for owner in stops[1][i:]]
+        targets = self._targets.get(token)
+        if targets:
+            # Target hit when price >= level: every level <= price
+            i = bisect.bisect_right(targets[0], price)
+            hits += [(owner, EXIT_TAKE_PROFIT) for owner in targets[1][:i]]
+        return hits
+
+
+class PriceWatcher:
+    """
+    Subscribes to prices for every held token and sells as soon as a tick crosses a
+    position's stop or take-profit, instead of waiting for the next 60s cycle.
+    Time exits stay in Strategy._manage_positions.
+    """
+    def __init__(self, source: PriceSource, traders: List, record: bool = Config.RECORD_MARKET_DATA):
+        self.source = source
+        self.traders = traders
+        self.record = record # Buffer ticks into the prices table (for sweeps)
+        self.index = ThresholdIndex()
+        self.latest: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._pending: Dict[str, List[Tuple[float, float]]] = {}
+        self.last_latency_ms = 0.0
+
+    def start(self):
+        self.refresh()
+        self.source.start(self.on_price)
+
+    def stop(self):
+        self.source.stop()
+        self.flush_prices()
+
+    def _index_token(self, token: str):
+        stops, targets = [], []
+        for trader in self.traders:
+            book = trader.positions
+            slot = book.slots.get(token)
+            if slot is None:
+                continue
+            if book.stop_price[slot] > 0:
+                stops.append((float(book.stop_price[slot]), trader))
+            if book.take_profit[slot] != float("inf"):
+                targets.append((float(book.take_profit[slot]), trader))
+        self.index.set_token(token, stops, targets)
+
+    def refresh(self):
+        """
+        Re-syncs the index and subscriptions with the books; call after each cycle.
+        """
+        with self._lock:
+            held = set()
+            for trader in self.traders:
+                held.update(trader.positions.slots)
+            for token in held | self.index.tokens():
+                self._index_token(token)
+            self.source.subscribe(held - self.source.tokens)
+            self.source.unsubscribe(self.source.tokens - held)
+        self.flush_prices()
+
+    def on_price(self, token: str, price: float, ts: Optional[float] = None):
+        start = time.perf_counter()
+        self.latest[token] = price
+        if self.record:
+            with self._lock:
+                self._pending.setdefault(token, []).append((ts or time.time(), price))
+
+        hits = self.index.crossed(token, price)
+        if not hits:
+            return
+        with self._lock:
+            for trader, reason in hits:
+                print(f"{reason} for {token} @ {price} (stream)")
+                trader.sell(token, price, reasoning=reason)
+            self._index_token(token)
+            if token not in self.index.tokens() and not any(token in t.positions for t in self.traders):
+                self.source.unsubscribe([token])
+        self.last_latency_ms = (time.perf_counter() - start) * 1000
+
+    def flush_prices(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+        from data.store import Store
+        store = Store()
+        for token, rows in pending.items():
+            store.add_prices(token, [r[0] for r in rows], [r[1] for r in rows])
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import signal
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Tuple
+from config import Config
+
+# Phase attribution: the innermost frame matching any rule decides, so a buy placed from
+# _scan_for_entries counts as trade and a trade's SQLite write as store I/O.
+# Rule order only breaks ties within a single frame.
+PHASE_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("store_io", ("store.py:",)),
+    ("label", ("nansen_client.py:get_wallet_labels", "wallet_index.py:")),
+    ("scan", ("nansen_client.py:", "strategy.py:_scan_for_entries")),
+    ("analysis", ("holding_time.py:", "hold_time_index.py:", "wallet_scorer.py:", "strategy.py:_check_buy_wave")),
+    ("trade", ("paper_trader.py:", "position_book.py:", "strategy.py:_manage_positions")),
+]
+
+
+def _frame_name(frame) -> str:
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def classify_stack(stack: Tuple[str, ...]) -> str:
+    """
+    `stack` is root first, leaf last.
+    """
+    for name in reversed(stack):
+        for phase, patterns in PHASE_RULES:
+            if name.startswith(patterns):
+                return phase
+    return "other"
+
+
+class CycleProfiler:
+    """
+    Low-overhead sampling profiler for the main loop.
+
+    While a cycle is being profiled, a background thread snapshots the cycle thread's
+    stack every `interval_ms`. Each profiled cycle writes a collapsed-stack file
+    (flamegraph.pl / speedscope compatible) and stores a top-N summary with a
+    per-phase breakdown in the Store.
+
+    Enabled with PROFILE_CYCLES=N (profile the next N cycles, -1 = always) and
+    toggled at runtime with `kill -USR1 <pid>`, so no restart is needed.
+    """
+    def __init__(self, cycles: int = 0, interval_ms: float = 5.0, output_dir: str = "profiles", top_n: int = 20):
+        self.remaining = cycles
+        self.interval = interval_ms / 1000.0
+        self.output_dir = output_dir
+        self.top_n = top_n
+        # Reentrant: toggle() runs as a signal handler on the main thread, possibly inside cycle()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls) -> "CycleProfiler":
+        return cls(
+            cycles=Config.PROFILE_CYCLES,
+            interval_ms=Config.PROFILE_INTERVAL_MS,
+            output_dir=Config.PROFILE_DIR
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.remaining != 0
+
+    def toggle(self, *_):
+        # Signal handler: off -> always on, on -> off
+        with self._lock:
+            self.remaining = 0 if self.enabled else -1
+        print(f"Cycle profiler {'ENABLED' if self.enabled else 'DISABLED'}")
+
+    def install_signal_handler(self, signum: int = getattr(signal, "SIGUSR1", 0)):
+        if signum and threading.current_thread() is threading.main_thread():
+            signal.signal(signum, self.toggle)
+
+    @contextmanager
+    def cycle(self, name: str = "run_cycle"):
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            if self.remaining > 0:
+                self.remaining -= 1
+
+        samples: Counter = Counter()
+        stop = threading.Event()
+        target = threading.get_ident()
+        sampler = threading.Thread(target=self._sample, args=(target, samples, stop),
+                                   name="cycle-profiler", daemon=True)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            self._report(name, samples, time.perf_counter() - start)
+
+    def _sample(self, target: int, samples: Counter, stop: threading.Event):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                stack.reverse() # Root first, leaf last
+                samples[tuple(stack)] += 1
+
+    def summarize(self, samples: Counter) -> Dict:
+        total = sum(samples.values())
+        self_counts: Counter = Counter()
+        inclusive: Counter = Counter()
+        phases: Counter = Counter()
+        for stack, count in samples.items():
+            self_counts[stack[-1]] += count
+            for name in set(stack):
+                inclusive[name] += count
+            phases[classify_stack(stack)] += count
+
+        def pct(n):
+            return round(100.0 * n / total, 2) if total else 0.0
+
+        return {
+            "samples": total,
+            "phases": {phase: pct(n) for phase, n in phases.most_common()},
+            "top_functions": [
+                {"function": name, "self_pct": pct(n), "total_pct": pct(inclusive[name])}
+                for name, n in self_counts.most_common(self.top_n)
+            ]
+        }
+
+    def _report(self, name: str, samples: Counter, duration: float):
+        summary = self.summarize(samples)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{name}_{datetime.utcnow().strftime('%Y%m%dT%H%M%S_%f')}.folded")
+        with open(path, "w") as f:
+            for stack, count in samples.items():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        from data.store import Store
+        store = Store()
+        store.add_profile(name, duration, summary, path)
+
+        phases = ", ".join(f"{k}={v}%" for k, v in summary["phases"].items())
+        print(f"PROFILE: {name} took {duration:.3f}s ({summary['samples']} samples) [{phases}] -> {path}")
@@ -1,20 +1,34 @@
-from typing import List
+from typing import Optional
 from datetime import datetime, timedelta
+import time
+import numpy as np
 from engine.paper_trader import PaperTrader
-from data.nansen_client import NansenClient
+from data.transfer_decoder import TransferBatch
+from engine.data_feed import DataFeed
 from analysis.holding_time import HoldingTimeAnalyzer
 from config import Config
 
 class Strategy:
-    def __init__(self, trader: PaperTrader):
+    def __init__(self, trader: PaperTrader, feed: Optional[DataFeed] = None, strategy_id: str = "default",
+                 buy_wave_threshold: int = 3, hold_fraction: float = 0.8, price_watcher=None):
         self.trader = trader
-        self.nansen = NansenClient(api_key=Config.NANSEN_API_KEY)
-        # Scanning BONK for testing
+        self.price_watcher = price_watcher # Optional PriceWatcher; supplies live quotes
+        self.strategy_id = strategy_id
+        self.buy_wave_threshold = buy_wave_threshold # Min smart-money txs to call a buy wave
+        self.hold_fraction = hold_fraction # Fraction of the median hold time to stay in
+        
+        # Shared feed when running alongside other variants, otherwise a private one
+        self._owns_feed = feed is None
+        self.feed = feed or DataFeed()
+        self.nansen = self.feed.nansen
+        # Scanning BONK for testing (used when the feed has no TokenDiscovery watchlist)
         self.active_tokens = ["DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"]
     
     def _log(self, message: str, level: str = "INFO"):
         from data.store import Store
         store = Store()
+        if self.strategy_id != "default":
+            message = f"[{self.strategy_id}] {message}"
         store.add_log(message, level)
         print(f"{level}: {message}")
 
@@ -24,12 +38,14 @@ class Strategy:
         1. Scan for Buy Waves
         2. Manage Open Positions
         """
+        if self._owns_feed:
+            self.feed.new_tick()
         self._scan_for_entries()
         self._manage_positions()
         
     def _scan_for_entries(self):
         self._log("Scanning for buy waves...", "INFO")
-        for token in self.active_tokens:
+        for chain, token in self.feed.scan_list(self.active_tokens):
             # Check if we already have a position
             if token in self.trader.positions:
                 continue
@@ -37,34 +53,55 @@ class Strategy:
             self._log(f"Scanning token {token}...", "INFO")
             
             # 1. Get recent Smart Money activity
-            txs = self.nansen.get_smart_money_transactions(token)
+            txs = self.feed.get_transfers(token, chain)
             
             if self._check_buy_wave(txs):
                 self._log(f"BUY WAVE DETECTED for {token}!", "SUCCESS")
-                # Calculate Median Holding Time
-                # Using 80% of median time to front-run the dump
-                median_hold_time = 240 # Mock median
-                target_hold_mins = median_hold_time * 0.8
+                # Smart-money median holding time for this token (default until enough holds are seen)
+                # Using a fraction (default 80%) of median time to front-run the dump
+                hold = self.feed.hold_times.get(token)
+                if hold is not None:
+                    median_hold_time = hold.median
+                    self._log(f"Hold time for {token}: median {hold.median:.0f}m "
+                              f"(p25 {hold.p25:.0f}m, p75 {hold.p75:.0f}m, {hold.samples} holds)", "INFO")
+                else:
+                    median_hold_time = Config.HOLD_TIME_DEFAULT_MINUTES
+                target_hold_mins = median_hold_time * self.hold_fraction
                 target_exit_time = datetime.now() + timedelta(minutes=target_hold_mins)
                 
-                self.trader.buy(token, amount_sol=1.0, price_per_token=0.01, target_exit_time=target_exit_time)
+                # Enter at the live quote when the price watcher has one (mock price otherwise)
+                price = self.price_watcher.latest.get(token) if self.price_watcher is not None else None
+                self.trader.buy(token, amount_sol=1.0, price_per_token=price or 0.01, target_exit_time=target_exit_time)
             else:
                  self._log(f"No signal for {token}. Found {len(txs)} SM txs.", "INFO")
                 
-    def _check_buy_wave(self, transactions: List) -> bool:
+    def _check_buy_wave(self, transactions: TransferBatch) -> bool:
         # Simplistic Buy Wave Logic:
-        # If we see >= 3 Smart Money transactions in the result, we trigger.
+        # If we see >= buy_wave_threshold (default 3) Smart Money transactions in the result, we trigger.
         # In production this would be: "3 buys in 10 minutes"
-        if len(transactions) >= 3:
+        if len(transactions) >= self.buy_wave_threshold:
             return True
         return False 
 
+    def _get_price_vector(self) -> np.ndarray:
+        """
+        Slot-aligned current prices for every open position (NaN = unknown).
+        """
+        if self.price_watcher is not None:
+            return self.trader.positions.price_vector(self.price_watcher.latest)
+        # Mock current price until a live price source is wired in. It is always above entry,
+        # so stop-losses never fire here (main.py warns about this at startup)
+        return self.trader.positions.entry_price * 1.05 # Mock 5% gain
+
     def _manage_positions(self):
-        # Check if we need to sell
-        for token, pos in list(self.trader.positions.items()):
-            # Time-based exit
-            if datetime.now() >= pos.target_exit_time:
-                print(f"Time Exit Triggered for {token}")
-                # Mock current price (randomly up or down)
-                current_price = pos.entry_price * 1.05 # Mock 5% gain
-                self.trader.sell(token, current_price)
+        # Check time exits, stop-losses and take-profits for all positions in one pass
+        book = self.trader.positions
+        if not len(book):
+            return
+        prices = self._get_price_vector()
+        for token, reason, slot in book.evaluate(prices, time.time()):
+            current_price = prices[slot]
+            if np.isnan(current_price):
+                current_price = book.entry_price[slot] # No quote, close flat
+            print(f"{reason} for {token}")
+            self.trader.sell(token, float(current_price), reasoning=reason)
@@ -0,0 +1,237 @@
+import os
+import json
+import random
+import itertools
+from datetime import datetime
+from multiprocessing import Pool, shared_memory
+from typing import Dict, List, Optional
+import numpy as np
+from engine.position_book import EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_TIME
+from config import Config
+
+# Live defaults; any key can be overridden per sweep point
+DEFAULT_PARAMS = {
+    "buy_wave_threshold": 3,
+    "median_hold_minutes": 240,
+    "hold_fraction": 0.8,
+    "stop_loss": Config.DEFAULT_STOP_LOSS,
+    "take_profit": Config.DEFAULT_TAKE_PROFIT,
+    "lookback_hours": 24,
+}
+
+# Live wave counts are len() of one page of transfers (NansenClient.get_smart_money_transfers)
+PAGE_ROWS = 50
+
+DEFAULT_SPACE = {
+    "buy_wave_threshold": [2, 3, 5, 8, 13],
+    "median_hold_minutes": [60, 120, 240, 480],
+    "hold_fraction": [0.5, 0.65, 0.8, 0.95],
+    "stop_loss": [0.0, 0.05, 0.1, 0.2],
+    "take_profit": [0.0, 0.1, 0.25, 0.5],
+}
+
+
+def grid_points(space: Dict[str, List]) -> List[Dict]:
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_points(space: Dict, n: int, seed: Optional[int] = None) -> List[Dict]:
+    """
+    Lists are sampled as choices; {"min": a, "max": b} as uniform ranges (integer if both ends are ints).
+    """
+    rng = random.Random(seed)
+    points = []
+    for _ in range(n):
+        point = {}
+        for key, spec in space.items():
+            if isinstance(spec, dict):
+                lo, hi = spec["min"], spec["max"]
+                point[key] = rng.randint(lo, hi) if isinstance(lo, int) and isinstance(hi, int) else rng.uniform(lo, hi)
+            else:
+                point[key] = rng.choice(spec)
+        points.append(point)
+    return points
+
+
+class MarketData:
+    """
+    Recorded transfer and price history packed into one flat float64 buffer, so it can be
+    placed in shared memory once and viewed (not copied or pickled) by every worker.
+    """
+    def __init__(self, buffer: np.ndarray, index: Dict[str, tuple]):
+        self.buffer = buffer
+        self.index = index # token -> (transfer_off, transfer_len, price_off, price_len)
+
+    @classmethod
+    def from_history(cls, history: Dict[str, Dict]) -> "MarketData":
+        parts, index, offset = [], {}, 0
+        for token, h in history.items():
+            t_ts = np.asarray(h["transfer_ts"], dtype=np.float64)
+            p_ts = np.asarray(h["price_ts"], dtype=np.float64)
+            prices = np.asarray(h["prices"], dtype=np.float64)
+            if not len(t_ts) or not len(p_ts):
+                continue # Can't trade a token without both signals and prices
+            index[token] = (offset, len(t_ts), offset + len(t_ts), len(p_ts))
+            parts += [t_ts, p_ts, prices]
+            offset += len(t_ts) + 2 * len(p_ts)
+        buffer = np.concatenate(parts) if parts else np.empty(0)
+        return cls(buffer, index)
+
+    @classmethod
+    def from_store(cls, start: Optional[float] = None, end: Optional[float] = None) -> "MarketData":
+        from data.store import Store
+        return cls.from_history(Store().get_market_history(start, end))
+
+    def token(self, token: str) -> tuple:
+        t_off, t_len, p_off, p_len = self.index[token]
+        b = self.buffer
+        return b[t_off:t_off + t_len], b[p_off:p_off + p_len], b[p_off + p_len:p_off + 2 * p_len]
+
+    def time_range(self) -> tuple:
+        lo, hi = np.inf, -np.inf
+        for token in self.index:
+            t_ts, p_ts, _ = self.token(token)
+            lo = min(lo, t_ts[0], p_ts[0])
+            hi = max(hi, t_ts[-1], p_ts[-1])
+        return lo, hi
+
+
+class Simulator:
+    """
+    Replays Strategy + PaperTrader rules over recorded data on a fixed cycle grid:
+    buy 1 SOL when the trailing transfer count reaches the wave threshold, exit on the
+    first cycle where the stop, take-profit or target time hits (same precedence as
+    PositionBook.evaluate), no re-entry while holding. Tokens are simulated independently,
+    i.e. the paper balance is assumed never to bind. Entries need a recorded quote, and
+    `median_hold_minutes` stands in for the token's hold-time median.
+    tests/test_sweep.py replays the live Strategy over the same data to keep these in step.
+    """
+    def __init__(self, data: MarketData, step_seconds: float = 60.0):
+        self.data = data
+        self.step = step_seconds
+        lo, hi = data.time_range() if data.index else (0.0, 0.0)
+        self.grid = np.arange(lo, hi + step_seconds, step_seconds)
+        self._prices = {}
+        self._counts = {}
+        for token in data.index:
+            _, p_ts, prices = data.token(token)
+            pos = np.searchsorted(p_ts, self.grid, side="right") - 1
+            self._prices[token] = np.where(pos >= 0, prices[np.maximum(pos, 0)], np.nan)
+
+    def _wave_counts(self, token: str, lookback_hours: float) -> np.ndarray:
+        key = (token, lookback_hours)
+        if key not in self._counts:
+            t_ts, _, _ = self.data.token(token)
+            counts = (np.searchsorted(t_ts, self.grid, side="right")
+                      - np.searchsorted(t_ts, self.grid - lookback_hours * 3600, side="right"))
+            self._counts[key] = np.minimum(counts, PAGE_ROWS)
+        return self._counts[key]
+
+    def _simulate_token(self, token: str, p: Dict) -> List[tuple]:
+        grid, price = self.grid, self._prices[token]
+        signal_idx = np.flatnonzero((self._wave_counts(token, p["lookback_hours"]) >= p["buy_wave_threshold"])
+                                    & ~np.isnan(price))
+        hold = p["median_hold_minutes"] * p["hold_fraction"] * 60
+        exit_idx = np.searchsorted(grid, grid + hold, side="left") # Time exit for an entry at each cycle
+        use_levels = p["stop_loss"] > 0 or p["take_profit"] > 0
+        trades = []
+        i = 0
+        while True:
+            j = np.searchsorted(signal_idx, i)
+            if j >= len(signal_idx):
+                break
+            k = int(signal_idx[j])
+            entry = price[k]
+            stop = entry * (1 - p["stop_loss"]) if p["stop_loss"] > 0 else 0.0
+            target = entry * (1 + p["take_profit"]) if p["take_profit"] > 0 else np.inf
+            kt = int(exit_idx[k])
+
+            hits = ()
+            if use_levels:
+                window = price[k + 1:kt + 1]
+                hits = np.flatnonzero((window <= stop) | (window >= target))
+            if len(hits):
+                x = k + 1 + hits[0]
+                reason = EXIT_STOP_LOSS if price[x] <= stop else EXIT_TAKE_PROFIT
+                exit_price = price[x]
+            elif kt < len(grid):
+                x = kt
+                reason = EXIT_TIME
+                exit_price = price[x] if not np.isnan(price[x]) else entry # No quote, close flat
+            else:
+                # Still open at the end of the data: mark to the last price
+                x = len(grid) - 1
+                reason = "Open"
+                exit_price = price[x]
+            trades.append((grid[x], exit_price / entry - 1.0, reason))
+            i = x + 1
+        return trades
+
+    def run(self, params: Dict, initial_balance: float = Config.PAPER_TRADING_BALANCE_SOL,
+            amount_sol: float = 1.0) -> Dict:
+        p = {**DEFAULT_PARAMS, **params}
+        trades = []
+        for token in self.data.index:
+            trades += self._simulate_token(token, p)
+        if not trades:
+            return {"params": params, "pnl": 0.0, "win_rate": 0.0, "max_drawdown": 0.0, "trades": 0}
+
+        trades.sort(key=lambda t: t[0])
+        pnl = np.array([t[1] for t in trades]) * amount_sol
+        equity = initial_balance + np.cumsum(pnl)
+        peak = np.maximum.accumulate(np.concatenate([[initial_balance], equity]))[1:]
+        return {
+            "params": params,
+            "pnl": float(pnl.sum()),
+            "win_rate": float((pnl > 0).mean()),
+            "max_drawdown": float(((peak - equity) / peak).max()),
+            "trades": len(trades)
+        }
+
+
+# --- Process pool plumbing: market data is attached from shared memory once per worker ---
+_worker = {}
+
+
+def _init_worker(shm_name: str, size: int, index: Dict, step_seconds: float):
+    shm = shared_memory.SharedMemory(name=shm_name) # Attach only; the parent unlinks it
+    buffer = np.ndarray((size,), dtype=np.float64, buffer=shm.buf)
+    _worker["shm"] = shm
+    _worker["sim"] = Simulator(MarketData(buffer, index), step_seconds)
+
+
+def _run_chunk(points: List[Dict]) -> List[Dict]:
+    sim = _worker["sim"]
+    return [sim.run(p) for p in points]
+
+
+def run_sweep(points: List[Dict], data: MarketData, step_seconds: float = 60.0,
+              workers: Optional[int] = None, chunk_size: int = 16) -> List[Dict]:
+    """
+    Evaluates every parameter point across a process pool and returns results ranked by PnL.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [points[i:i + chunk_size] for i in range(0, len(points), chunk_size)]
+
+    if workers == 1 or not len(data.buffer):
+        sim = Simulator(data, step_seconds)
+        results = [sim.run(p) for p in points]
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=data.buffer.nbytes)
+        try:
+            np.ndarray(data.buffer.shape, dtype=np.float64, buffer=shm.buf)[:] = data.buffer
+            with Pool(workers, initializer=_init_worker,
+                      initargs=(shm.name, len(data.buffer), data.index, step_seconds)) as pool:
+                results = [r for chunk in pool.imap_unordered(_run_chunk, chunks) for r in chunk]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    # Final tiebreak on the params so the ranking doesn't depend on which worker finished first
+    results.sort(key=lambda r: (-r["pnl"], -r["win_rate"], r["max_drawdown"], json.dumps(r["params"], sort_keys=True)))
+    return results
+
+
+def new_run_id() -> str:
+    return datetime.utcnow().strftime("sweep_%Y%m%dT%H%M%S")
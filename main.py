@@ -1,8 +1,15 @@
 import time
+import json
 from config import Config
 from engine.strategy import Strategy
 from engine.paper_trader import PaperTrader
 from data.nansen_client import NansenClient
+from engine.profiler import CycleProfiler
+from engine.checkpoint import CheckpointManager
+from engine.data_feed import DataFeed, StrategyRunner
+from engine.price_stream import PriceWatcher, WebSocketPriceSource
+from engine.memory import MemoryMonitor
+from engine.discovery import TokenDiscovery, NansenFlowSource
 
 def main():
     print("Starting Solana Nansen Bot...")
@@ -10,14 +17,63 @@ def main():
     
     # Initialize components
     nansen = NansenClient(api_key=Config.NANSEN_API_KEY)
-    trader = PaperTrader(initial_balance=Config.PAPER_TRADING_BALANCE_SOL)
-    strategy = Strategy(trader=trader) # Note: Strategy creates its own NansenClient internally in current code, let's fix that.
+    # Dynamic watchlist ranked by smart-money net inflow across chains (DISCOVERY_CANDIDATES)
+    discovery = None
+    if Config.DISCOVERY_CANDIDATES:
+        discovery = TokenDiscovery(NansenFlowSource(nansen), record=Config.RECORD_MARKET_DATA)
+    # One fetch per token per tick, shared by every strategy. Sweeps need prices next to the
+    # transfers, so without a price stream recording them would only grow the table
+    feed = DataFeed(nansen, discovery=discovery, record=Config.RECORD_MARKET_DATA and bool(Config.PRICE_STREAM_URL))
+    checkpoints = CheckpointManager()
     
-    print(f"Initial Portfolio Value: {trader.get_portfolio_value()} SOL")
+    strategies = []
+    for params in [{"id": "default"}] + json.loads(Config.STRATEGY_VARIANTS):
+        params = dict(params)
+        strategy_id = params.pop("id")
+        trader = PaperTrader(initial_balance=Config.PAPER_TRADING_BALANCE_SOL,
+                             stop_loss=params.pop("stop_loss", Config.DEFAULT_STOP_LOSS),
+                             take_profit=params.pop("take_profit", Config.DEFAULT_TAKE_PROFIT),
+                             log_initial=False, strategy_id=strategy_id)
+        strategies.append(Strategy(trader=trader, feed=feed, strategy_id=strategy_id, **params))
+    runner = StrategyRunner(feed, strategies)
+    components = runner.components()
+    for name, component in components.items():
+        if name.startswith("trader"):
+            component.journal = checkpoints.journal_for(name) # Write-ahead trade journal
+    
+    # Warm restart: latest checkpoint + journal tail, otherwise start fresh
+    if not checkpoints.restore(components):
+        print("No checkpoint found, starting with a fresh portfolio.")
+    from data.store import Store
+    for strategy in strategies:
+        Store().log_portfolio(strategy.trader.balance_sol, strategy.trader.positions, strategy_id=strategy.strategy_id)
+    
+    # Streaming stop-loss / take-profit exits between cycles
+    watcher = None
+    if Config.PRICE_STREAM_URL:
+        watcher = PriceWatcher(WebSocketPriceSource(Config.PRICE_STREAM_URL), [s.trader for s in strategies])
+        for strategy in strategies:
+            strategy.price_watcher = watcher
+        watcher.start()
+    else:
+        # The mock price vector sits above entry, so stop-losses can only fire with a live quote source
+        stopped = [s.strategy_id for s in strategies if s.trader.stop_loss > 0]
+        if stopped:
+            print(f"WARNING: stop-loss set for {', '.join(stopped)} but PRICE_STREAM_URL is empty; "
+                  f"stops will not fire without a price source.")
+    
+    # On-demand profiling: PROFILE_CYCLES=N or `kill -USR1 <pid>`
+    profiler = CycleProfiler.from_config()
+    profiler.install_signal_handler()
+    
+    # RSS + capped structure sizes, written to system_status["memory"] each cycle
+    memory = MemoryMonitor(strategies, feed=feed)
+    
+    for strategy in strategies:
+        print(f"Initial Portfolio Value [{strategy.strategy_id}]: {strategy.trader.get_portfolio_value()} SOL")
     
     # Main Loop
     try:
-        from data.store import Store
         store = Store()
         
         while True:
@@ -25,12 +81,21 @@ def main():
             store.update_heartbeat() # Pulse
             
             # Mock loop for now
-            strategy.run_cycle()
+            with profiler.cycle():
+                runner.run_cycle()
+            if watcher:
+                watcher.refresh() # Index positions opened this cycle
+            checkpoints.maybe_save(components)
+            memory.report()
             time.sleep(60) # Run every minute
             
     except KeyboardInterrupt:
         print("Bot stopped by user.")
-        print(f"Final Portfolio Value: {trader.get_portfolio_value()} SOL")
+        if watcher:
+            watcher.stop()
+        checkpoints.save(components)
+        for strategy in strategies:
+            print(f"Final Portfolio Value [{strategy.strategy_id}]: {strategy.trader.get_portfolio_value()} SOL")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,17 @@
+from data.store import Store, ANALYTICS_VERSION
+
+def main():
+    """
+    Recomputes the analytics summary tables (PnL by token/day, exposure, drawdown)
+    from the full trades and portfolio history.
+    """
+    store = Store()
+    trades, snapshots = store.rebuild_analytics()
+    print(f"Rebuilt analytics v{ANALYTICS_VERSION} from {trades} trades and {snapshots} portfolio snapshots.")
+    summary = store.get_performance_summary()
+    if summary:
+        print(f"Realized PnL: {summary['realized_pnl']:.4f} SOL, win rate {summary['win_rate']:.0%}, "
+              f"max drawdown {summary['max_drawdown']:.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import json
+import time
+import argparse
+from engine.sweep import (DEFAULT_SPACE, MarketData, grid_points, random_points, run_sweep, new_run_id)
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep over recorded transfer and price history.")
+    parser.add_argument("--space", help="JSON (or path to a JSON file) mapping param -> list or {min, max}")
+    parser.add_argument("--random", type=int, default=0, help="Sample N random points instead of the full grid")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--step-seconds", type=float, default=60.0, help="Simulated cycle interval (main loop is 60s)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        try:
+            with open(args.space) as f:
+                space = json.load(f)
+        except OSError:
+            space = json.loads(args.space)
+
+    points = random_points(space, args.random, args.seed) if args.random else grid_points(space)
+
+    data = MarketData.from_store()
+    if not data.index:
+        print("No recorded market data (need both transfers and prices). Let the bot run with RECORD_MARKET_DATA=1 and PRICE_STREAM_URL set first.")
+        return
+    print(f"Sweeping {len(points)} configurations over {len(data.index)} tokens...")
+
+    start = time.perf_counter()
+    results = run_sweep(points, data, step_seconds=args.step_seconds, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    run_id = new_run_id()
+    from data.store import Store
+    Store().add_sweep_results(run_id, results)
+
+    print(f"Done in {elapsed:.1f}s ({len(points) / elapsed:.0f} configs/s). Results stored as {run_id}.")
+    print(f"{'#':>3} {'PnL (SOL)':>10} {'Win %':>7} {'Max DD %':>9} {'Trades':>7}  Params")
+    for rank, r in enumerate(results[:args.top], 1):
+        print(f"{rank:>3} {r['pnl']:>10.4f} {r['win_rate'] * 100:>7.1f} {r['max_drawdown'] * 100:>9.2f} {r['trades']:>7}  {r['params']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import math
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import engine.strategy
+from analysis.hold_time_index import HoldTimeIndex
+from config import Config
+from data.transfer_decoder import TransferBatch
+from engine.paper_trader import PaperTrader
+from engine.strategy import Strategy
+from engine.sweep import MarketData, Simulator, PAGE_ROWS
+
+T0 = 1_700_000_040.0 # On a 60s boundary
+TOKEN = "TOK"
+
+
+def make_history(minutes: int = 400) -> dict:
+    price_ts = [T0 + 60 * i for i in range(minutes)]
+    prices = [1.0 + 0.3 * math.sin(i / 15) for i in range(minutes)]
+    # Buy waves of 4 transfers, plus one burst bigger than a page
+    transfer_ts = [T0 + 60 * m + 5 + s for m in (10, 100, 200) for s in range(4)]
+    transfer_ts += [T0 + 60 * 300 + 5 + s * 0.01 for s in range(PAGE_ROWS + 20)]
+    return {TOKEN: {"transfer_ts": sorted(transfer_ts), "price_ts": price_ts, "prices": prices}}
+
+
+class ReplayFeed:
+    """
+    Serves the recorded transfers the way DataFeed does: one page of the trailing window.
+    """
+    def __init__(self, transfer_ts: np.ndarray, lookback_hours: float):
+        self.transfer_ts = transfer_ts
+        self.lookback = lookback_hours * 3600
+        self.hold_times = HoldTimeIndex(persist=False)
+        self.nansen = None
+        self.now = 0.0
+
+    def scan_list(self, default, chain="solana"):
+        return [(chain, token) for token in default]
+
+    def get_transfers(self, token, chain="solana"):
+        ts = self.transfer_ts[(self.transfer_ts > self.now - self.lookback) & (self.transfer_ts <= self.now)][:PAGE_ROWS]
+        n = len(ts)
+        addresses = np.array([f"W{i}" for i in range(n)], dtype=object)
+        return TransferBatch(token, addresses, addresses, addresses, np.ones(n), ts, np.zeros(n, dtype=np.int64))
+
+
+def replay_strategy(history: dict, params: dict, monkeypatch) -> list:
+    clock = [0.0]
+
+    class ReplayDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock[0], tz)
+
+    monkeypatch.setattr(engine.strategy, "datetime", ReplayDatetime)
+    monkeypatch.setattr(engine.strategy, "time", SimpleNamespace(time=lambda: clock[0]))
+    monkeypatch.setattr(Strategy, "_log", lambda self, message, level="INFO": None)
+
+    data = MarketData.from_history(history)
+    t_ts, p_ts, prices = data.token(TOKEN)
+    feed = ReplayFeed(t_ts, params["lookback_hours"])
+    watcher = SimpleNamespace(latest={})
+    trader = PaperTrader(initial_balance=50.0, stop_loss=params["stop_loss"], take_profit=params["take_profit"],
+                         log_initial=False)
+    strategy = Strategy(trader, feed=feed, buy_wave_threshold=params["buy_wave_threshold"],
+                        hold_fraction=params["hold_fraction"], price_watcher=watcher)
+    strategy.active_tokens = [TOKEN]
+
+    for now in Simulator(data).grid:
+        clock[0] = feed.now = now
+        i = np.searchsorted(p_ts, now, side="right") - 1
+        watcher.latest = {TOKEN: prices[i]} if i >= 0 else {}
+        strategy.run_cycle()
+    return [(t["reasoning"], t["pnl_percent"] / 100) for t in reversed(trader.get_trade_history(1000)) if t["type"] == "SELL"]
+
+
+@pytest.mark.parametrize("params", [
+    {"buy_wave_threshold": 3, "hold_fraction": 0.5, "stop_loss": 0.1, "take_profit": 0.2, "lookback_hours": 1},
+    {"buy_wave_threshold": 3, "hold_fraction": 0.8, "stop_loss": 0.0, "take_profit": 0.0, "lookback_hours": 24},
+    {"buy_wave_threshold": 60, "hold_fraction": 0.3, "stop_loss": 0.05, "take_profit": 0.0, "lookback_hours": 2},
+])
+def test_simulator_matches_strategy_replay(params, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path) # PaperTrader writes its trades to the Store
+    history = make_history()
+    p = {**params, "median_hold_minutes": Config.HOLD_TIME_DEFAULT_MINUTES}
+    simulated = [(reason, ret) for _, ret, reason in Simulator(MarketData.from_history(history))._simulate_token(TOKEN, p)
+                 if reason != "Open"]
+
+    live = replay_strategy(history, params, monkeypatch)
+    assert live or params["buy_wave_threshold"] > PAGE_ROWS # A wave bigger than one page is never seen live
+    assert [r for r, _ in live] == [r for r, _ in simulated]
+    assert np.allclose([x for _, x in live], [x for _, x in simulated])
@@ -0,0 +1,29 @@
+import json
+from data.transfer_decoder import decode_transfers, iter_json_array_items
+
+ROW = {"tx_hash": "tx1", "from_address": "A", "to_address": "B", "quantity": 1.5,
+       "block_timestamp": "2025-12-07T10:17:00Z", "block_number": 300000000}
+
+
+def chunked(body: bytes, size: int):
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def test_only_the_top_level_key_is_read():
+    body = json.dumps({"meta": {"data": [1]}, "note": "\"data\": [2]", "data": [ROW, ROW]}).encode()
+    for size in (1, 7, 4096):
+        assert list(iter_json_array_items(chunked(body, size))) == [ROW, ROW]
+
+
+def test_torn_trailing_item_is_rejected():
+    body = json.dumps({"data": [ROW, ROW]}).encode()[:-20]
+    batch = decode_transfers(iter_json_array_items(chunked(body, 16)), "T")
+    assert len(batch) == 1
+    assert batch.rejected == 1
+
+
+def test_non_dict_items_are_rejected():
+    body = json.dumps({"data": [ROW, 5, "x", None, [ROW]]}).encode()
+    batch = decode_transfers(iter_json_array_items([body]), "T")
+    assert len(batch) == 1
+    assert batch.rejected == 4
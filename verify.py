@@ -1,10 +1,11 @@
 import datetime
 from data.models import Transaction
+from data.transfer_decoder import TransferBatch
 from engine.strategy import Strategy
 from engine.paper_trader import PaperTrader
 import time
 
-def mock_get_smart_money_transactions(token_address):
+def mock_get_smart_money_transactions(token_address, lookback_hours=24, chain="solana"):
     """
     Overrides the strategy's nansen client method to return a BUY WAVE.
     """
@@ -27,7 +28,7 @@ def mock_get_smart_money_transactions(token_address):
             block_number=1000+i
         )
         txs.append(tx)
-    return txs
+    return TransferBatch.from_transactions(token_address, txs)
 
 def run_verification():
     print("--- Starting Verification Simulation ---")
@@ -38,7 +39,7 @@ def run_verification():
     
     # Override the method on the instance to inject mock data
     # We need to monkeypath the nansen client instance inside strategy
-    strategy.nansen.get_smart_money_transactions = mock_get_smart_money_transactions
+    strategy.nansen.get_smart_money_transfers = mock_get_smart_money_transactions
     
     # Override _check_buy_wave to TRUE for this test, or ensure logic passes
     # Let's inspect _check_buy_wave in strategy.py... it returns False by default.
@@ -84,7 +85,7 @@ def run_verification():
     # 3. Simulate Time Passing for Exit
     print("\n[Step 2] Simulating Time Pass (Expecting SELL)...")
     # Manually adjust target_exit_time to be in the past
-    trader.positions["MockTokenAddress123"].target_exit_time = datetime.datetime.now() - datetime.timedelta(minutes=1)
+    trader.positions.set_target_exit("MockTokenAddress123", datetime.datetime.now() - datetime.timedelta(minutes=1))
     
     strategy.run_cycle()
     